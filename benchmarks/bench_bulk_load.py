@@ -0,0 +1,62 @@
+"""Benchmark bulk_load.copy_df_to_table() (COPY) against DataFrame.to_sql(method='multi')
+
+Loads a scaled cast_members frame into a scratch table (bench_cast_members) in netflix_db, which must be running.
+Run from the repository root:
+    python -m benchmarks.bench_bulk_load --sizes 10000 60000 500000
+"""
+
+import argparse
+from time import perf_counter
+import pandas as pd
+import bulk_load
+import update_data
+from benchmarks.bench_cast_members_df import scale_input
+
+
+def load_with_to_sql(df:pd.DataFrame,table_name:str,conn):
+    """Previous load path of the update_table_* functions
+    """
+
+    df.to_sql(
+        name = table_name,
+        con = conn,
+        if_exists='append',
+        index=False,
+        method='multi')
+
+
+def run_benchmark(sizes:list,file_path:str = 'input_data/netflix_titles.csv'):
+    """Returns a DataFrame with rows/sec of each load path for each frame size
+    """
+
+    netflix_df = pd.read_csv(file_path)
+    conn = update_data.create_connection()
+    results = []
+    for rows_qty in sizes:
+        # cast_members-shaped frame with at least "rows_qty" rows
+        titles_qty = max(rows_qty//7,1)
+        cast_members_df = update_data.create_cast_members_df(scale_input(netflix_df,titles_qty))
+        cast_members_df = cast_members_df.iloc[:rows_qty].assign(gender = 'female')
+        for method,load in [('to_sql_multi',load_with_to_sql),('copy',bulk_load.copy_df_to_table)]:
+            conn.execute('DROP TABLE IF EXISTS bench_cast_members')
+            conn.execute('CREATE TABLE bench_cast_members (show_id text NOT NULL, cast_member text, gender text)')
+            t_start = perf_counter()
+            load(cast_members_df,'bench_cast_members',conn)
+            elapsed_s = perf_counter() - t_start
+            results.append({
+                'method':method,
+                'rows':len(cast_members_df),
+                'elapsed_s':elapsed_s,
+                'rows_per_s':len(cast_members_df)/elapsed_s})
+    conn.execute('DROP TABLE IF EXISTS bench_cast_members')
+    conn.close()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes',type = int,nargs = '+',default = [10_000,60_000,500_000])
+    args = parser.parse_args()
+
+    print(run_benchmark(args.sizes).to_string(index = False))
@@ -0,0 +1,91 @@
+"""Benchmark update_data.create_cast_members_df() against the previous row-by-row loop
+
+Run from the repository root:
+    python -m benchmarks.bench_cast_members_df
+    python -m benchmarks.bench_cast_members_df --sizes 10000 100000 1000000 --legacy-max-titles 100000
+"""
+
+import argparse
+from time import perf_counter
+import numpy as np
+import pandas as pd
+import update_data
+
+
+def scale_input(netflix_df:pd.DataFrame,titles_qty:int,seed:int = 0):
+    """Returns a DataFrame with "titles_qty" titles resampled from the input, each with a new show_id
+    """
+
+    scaled_df = netflix_df.sample(n = titles_qty,replace = True,random_state = seed).reset_index(drop = True)
+    scaled_df['show_id'] = ['s' + str(i) for i in range(1,titles_qty + 1)]
+
+    return scaled_df
+
+
+def legacy_create_cast_members_df(netflix_df:pd.DataFrame):
+    """Previous implementation of create_cast_members_df() (re-filters the whole frame for every row, O(n²))
+    """
+
+    netflix_cast_members_df = netflix_df.loc[:,['show_id','cast']]
+    netflix_cast_members_df['cast'] =  [str(name).split(',') for name in netflix_cast_members_df['cast']]
+    netflix_cast_members_df['show_id'] = netflix_cast_members_df['show_id'].astype('category')
+
+    show_id_list, cast_members_list = [[] for i in range(2)]
+    for show_id,i in zip(netflix_cast_members_df.show_id, range(len(netflix_cast_members_df.show_id))):
+        cast_members = netflix_cast_members_df[netflix_cast_members_df.show_id == show_id].cast[i]
+        for member in cast_members:
+            show_id_list.append(show_id)
+            cast_members_list.append(member)
+    cast_members_df = pd.DataFrame({'show_id':show_id_list,'cast_member':cast_members_list})
+
+    cast_members_df.cast_member = cast_members_df.cast_member.apply(
+        lambda x:
+        x.strip()
+        if x != 'nan'
+        else np.nan)
+
+    return cast_members_df
+
+
+def time_function(func,netflix_df:pd.DataFrame):
+    """Returns (elapsed seconds, result) of func(netflix_df)
+    """
+
+    t_start = perf_counter()
+    result = func(netflix_df)
+    t_end = perf_counter()
+
+    return t_end - t_start, result
+
+
+def run_benchmark(sizes:list,legacy_max_titles:int,file_path:str = 'input_data/netflix_titles.csv'):
+    """Times both implementations for each size and checks that they return the same frame
+    * The legacy loop is skipped above "legacy_max_titles" (quadratic runtime)
+    """
+
+    netflix_df = pd.read_csv(file_path)
+    results = []
+    for titles_qty in sizes:
+        scaled_df = scale_input(netflix_df,titles_qty)
+        vectorized_s, vectorized_df = time_function(update_data.create_cast_members_df,scaled_df)
+        legacy_s = np.nan
+        if titles_qty <= legacy_max_titles:
+            legacy_s, legacy_df = time_function(legacy_create_cast_members_df,scaled_df)
+            pd.testing.assert_frame_equal(vectorized_df,legacy_df.astype({'show_id':'object'}))
+        results.append({
+            'titles':titles_qty,
+            'cast_rows':len(vectorized_df),
+            'legacy_s':legacy_s,
+            'vectorized_s':vectorized_s,
+            'speedup':legacy_s/vectorized_s})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes',type = int,nargs = '+',default = [10_000,100_000,1_000_000])
+    parser.add_argument('--legacy-max-titles',type = int,default = 10_000)
+    args = parser.parse_args()
+
+    print(run_benchmark(args.sizes,args.legacy_max_titles).to_string(index = False))
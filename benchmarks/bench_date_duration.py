@@ -0,0 +1,81 @@
+"""Benchmark the vectorized date_added/duration transforms against the previous row-by-row .apply
+
+Compares update_data.split_titles_by_type() with the previous treatment of update_table_movies() and
+update_table_tv_shows() (strptime and two regex calls per row), and checks that both return the same frames.
+Run from the repository root:
+    python -m benchmarks.bench_date_duration --sizes 100000 1000000
+"""
+
+import argparse
+import re
+from datetime import datetime
+from time import perf_counter
+import numpy as np
+import pandas as pd
+import update_data
+from benchmarks.bench_cast_members_df import scale_input
+
+
+def legacy_transform(netflix_df:pd.DataFrame,title_type:str,duration_col:str):
+    """Previous treatment of update_table_movies()/update_table_tv_shows()
+    """
+
+    df_type = netflix_df.loc[
+        netflix_df.type == title_type,
+        ['show_id','date_added','release_year','duration']]
+    df_type['date_added'] = df_type['date_added'].apply(
+        lambda x:
+        datetime.strptime(x.strip(), '%B %d, %Y')
+        if x == x
+        else np.nan)
+    df_type['duration'] = df_type['duration'].apply(
+        lambda x:
+        int(re.findall(r'\d+',x)[0])
+        if re.search(r'\d+',str(x))
+        else np.nan)
+
+    return df_type.rename(columns = {'duration':duration_col})
+
+
+def legacy_split_titles_by_type(netflix_df:pd.DataFrame):
+    """Previous path: the input is filtered and treated once per title type
+    """
+
+    return {
+        title_type:legacy_transform(netflix_df,title_type,duration_col)
+        for title_type,duration_col in update_data.DURATION_COLS.items()}
+
+
+def run_benchmark(sizes:list,file_path:str = 'input_data/netflix_titles.csv'):
+    """Returns a DataFrame with the runtime of both paths for each size
+    """
+
+    netflix_df = pd.read_csv(file_path)
+    results = []
+    for titles_qty in sizes:
+        scaled_df = scale_input(netflix_df,titles_qty)
+        timings = {}
+        for method,split in [('legacy_apply',legacy_split_titles_by_type),('vectorized',update_data.split_titles_by_type)]:
+            t_start = perf_counter()
+            titles_by_type = split(scaled_df)
+            timings[method] = perf_counter() - t_start
+            timings[method + '_result'] = titles_by_type
+        for title_type in update_data.DURATION_COLS:
+            pd.testing.assert_frame_equal(
+                timings['vectorized_result'][title_type],
+                timings['legacy_apply_result'][title_type])
+        results.append({
+            'titles':titles_qty,
+            'legacy_apply_s':timings['legacy_apply'],
+            'vectorized_s':timings['vectorized'],
+            'speedup':timings['legacy_apply']/timings['vectorized']})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes',type = int,nargs = '+',default = [100_000,1_000_000])
+    args = parser.parse_args()
+
+    print(run_benchmark(args.sizes).to_string(index = False))
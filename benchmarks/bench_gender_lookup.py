@@ -0,0 +1,56 @@
+"""Benchmark update_data.threading_gender_request() against update_data.async_gender_request()
+
+Both run against the local stub API (benchmarks/stub_gender_server.py), without the persistent cache.
+Run from the repository root:
+    python -m benchmarks.bench_gender_lookup --names 2000 --latency-s 0.2 --failure-rate 0.05
+"""
+
+import argparse
+from time import perf_counter
+import pandas as pd
+import update_data
+from benchmarks.stub_gender_server import start_stub_server
+
+
+def run_benchmark(names_qty:int,latency_s:float,failure_rate:float,qty_threads:int,concurrency:int,rate_limit:float):
+    """Returns a DataFrame with runtime, requests/sec and failed requests of each implementation
+    """
+
+    cast_members_df = pd.DataFrame({
+        'show_id':['s1']*names_qty,
+        'cast_member':[f'Name{i} Surname{i}' for i in range(names_qty)]})
+    results = []
+    for engine in ['threading','asyncio']:
+        server, api_url = start_stub_server(latency_s = latency_s,failure_rate = failure_rate)
+        t_start = perf_counter()
+        if engine == 'threading':
+            gender_df = update_data.threading_gender_request(
+                cast_members_df,qty_threads = qty_threads,use_cache = False,api_url = api_url)
+        else:
+            gender_df = update_data.async_gender_request(
+                cast_members_df,concurrency = concurrency,rate_limit = rate_limit,use_cache = False,api_url = api_url)
+        elapsed_s = perf_counter() - t_start
+        server.shutdown()
+        results.append({
+            'engine':engine,
+            'names':names_qty,
+            'http_requests':server.requests_qty,
+            'elapsed_s':elapsed_s,
+            'names_per_s':names_qty/elapsed_s,
+            'request_failed':int((gender_df.gender == 'request_failed').sum())})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--names',type = int,default = 2000)
+    parser.add_argument('--latency-s',type = float,default = 0.2)
+    parser.add_argument('--failure-rate',type = float,default = 0.05)
+    parser.add_argument('--threads',type = int,default = 100)
+    parser.add_argument('--concurrency',type = int,default = 100)
+    parser.add_argument('--rate-limit',type = float,default = 1000)
+    args = parser.parse_args()
+
+    print(run_benchmark(
+        args.names,args.latency_s,args.failure_rate,args.threads,args.concurrency,args.rate_limit).to_string(index = False))
@@ -0,0 +1,104 @@
+"""Benchmark the memory of the ingest path with the compact input dtypes (update_data.INPUT_DTYPES) against the
+dtypes inferred by pandas (object columns)
+
+For each mode a fresh process reads a synthetic catalogue (benchmarks/synthetic_catalogue.py) and runs the
+transforms of the ETL without the db: titles (with the content hash), movies/tv_shows, cast_members, canonical
+name index and genres/countries bridge rows. The process peak RSS is measured after each stage, with the
+in-memory size of the input and cast_members DataFrames.
+Run from the repository root:
+    python -m benchmarks.bench_ingest_memory --titles 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+import pandas as pd
+import instrumentation
+import name_normalization
+import update_data
+
+MODES = {'object':False,'compact':True}
+
+
+def _frame_mb(df:pd.DataFrame):
+    """Returns the in-memory size of "df" (MB), strings included
+    """
+
+    return df.memory_usage(deep = True).sum()/1024**2
+
+
+def measure_ingest(file_path:str,compact_dtypes:bool):
+    """Returns a list of dicts (stage, wall_s, peak_rss_mb) for the ingest stages run in this process, and the size
+    of the input and cast_members DataFrames (stage "frames")
+    """
+
+    results = []
+
+    def timed(stage_name,function):
+        t_start = perf_counter()
+        result = function()
+        results.append({
+            'stage':stage_name,'wall_s':perf_counter() - t_start,'peak_rss_mb':instrumentation.peak_rss_mb()})
+        return result
+
+    results.append({'stage':'start','wall_s':0,'peak_rss_mb':instrumentation.peak_rss_mb()})
+    netflix_df = timed(
+        'load_input',lambda: update_data.load_input(False,file_path,compact_dtypes = compact_dtypes))
+    timed('transform_titles',lambda: update_data.update_table_title(netflix_df,update_db = False).assign(
+        content_hash = update_data.compute_content_hash(netflix_df)))
+    timed('transform_movies_tv_shows',lambda: update_data.split_titles_by_type(netflix_df))
+    cast_members_df = timed('create_cast_members_df',lambda: update_data.create_cast_members_df(netflix_df))
+    timed('build_name_index',lambda: name_normalization.build_name_index(cast_members_df.cast_member))
+    timed('genres_countries_rows',lambda: [
+        update_data.split_list_column(netflix_df,column) for column in ['listed_in','country']])
+    results.append({
+        'stage':'frames',
+        'input_df_mb':_frame_mb(netflix_df),
+        'cast_members_df_mb':_frame_mb(cast_members_df),
+        'peak_rss_mb':instrumentation.peak_rss_mb()})
+
+    return results
+
+
+def run_benchmark(titles_qty:int,seed:int = 0):
+    """Returns a DataFrame with the peak RSS and wall time of each stage in both modes (one process per mode)
+    """
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir,f'netflix_titles_{titles_qty}.csv')
+        # Generated in its own process too: the peak RSS of a child process starts from the one of its parent
+        subprocess.run(
+            [sys.executable,'-m','benchmarks.synthetic_catalogue',
+             '--titles',str(titles_qty),'--seed',str(seed),'--output',file_path],
+            capture_output = True,check = True)
+        for mode in MODES:
+            process = subprocess.run(
+                [sys.executable,'-m','benchmarks.bench_ingest_memory','--measure',file_path,'--mode',mode],
+                capture_output = True,text = True,check = True)
+            # The measures are the last line, the stages print their own lines before
+            for record in json.loads(process.stdout.strip().splitlines()[-1]):
+                rows.append({'mode':mode,**record})
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles',type = int,default = 1_000_000)
+    parser.add_argument('--seed',type = int,default = 0)
+    parser.add_argument('--measure',default = None,help = argparse.SUPPRESS) # child process: catalogue to measure
+    parser.add_argument('--mode',choices = list(MODES),default = 'compact',help = argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure_ingest(args.measure,MODES[args.mode])))
+    else:
+        results_df = run_benchmark(args.titles,args.seed)
+        stages_df = results_df[results_df.stage != 'frames'].dropna(axis = 1).pivot(index = 'stage',columns = 'mode')
+        print(stages_df.reindex(results_df.stage.drop_duplicates()).dropna(how = 'all').round(2).to_string())
+        print(results_df[results_df.stage == 'frames'].dropna(axis = 1).round(1).to_string(index = False))
@@ -0,0 +1,191 @@
+"""Benchmark the first-name and co-star analytics (analysis queries 01 and 05) against the SQL they replace
+
+A synthetic catalogue (benchmarks/synthetic_catalogue.py, 10x the sample input by default) is loaded into temporary
+copies of the tables (rolled back at the end, netflix_db is left untouched), then for each variant the summary
+tables are refreshed for all the titles and both queries are run:
+* on_the_fly: the original queries, first names parsed with SUBSTRING on every report, co-stars found with an
+  IN subquery on cast_members (no summary table)
+* name_keyed: first names parsed with SUBSTRING at refresh time, co-star pairs keyed by name and co-star gender
+  (costar_pairs, the tables before cast_members.first_name and person_costars)
+* person_keyed: first names parsed once in Arrow by the ETL (update_data.split_names()), co-stars keyed by
+  person_id (person_costars), queries read through their indexes (current sql_queries)
+gender_batch_refresh_s is the summary refresh of the titles of a batch of names backfilled by gender_worker.py
+(subtracted then added back: costar_pairs was keyed by co-star gender, person_costars is not).
+Query 05 looks up the cast member with the most titles (the synthetic names do not include Woody Harrelson).
+netflix_db must be running. Run from the repository root:
+    python -m benchmarks.bench_name_analytics --titles 77870 --repeat 5
+"""
+
+import argparse
+import os
+import tempfile
+from time import perf_counter
+import pandas as pd
+from sqlalchemy import text
+import gender_worker
+import update_data
+from benchmarks.run_benchmarks import BENCHMARK_TABLES
+from benchmarks.stub_gender_server import stub_gender
+from benchmarks.synthetic_catalogue import write_catalogue
+
+SAMPLE_TITLES = 7_787 # titles of input_data/netflix_titles.csv
+QUERIES = {
+    '01':'sql_queries/analysis_queries/01_most_common_first_name.sql',
+    '05':'sql_queries/analysis_queries/05_actresses_more_than_one_movie_with_wood.sql'}
+
+# SQL replaced by cast_members.first_name and person_costars, kept as the baselines (GROUP BY 1: cast_members
+# now has a first_name column, which GROUP BY first_name would refer to)
+FIRST_NAME_SQL = """CASE
+    WHEN SUBSTRING(cast_member,0,strpos(cast_member,' ')) = '' THEN cast_member
+    ELSE SUBSTRING(cast_member,0,strpos(cast_member,' '))
+    END"""
+ON_THE_FLY_QUERIES = {
+    '01':f"""SELECT {FIRST_NAME_SQL} AS first_name, COUNT({FIRST_NAME_SQL}) AS first_name_qty
+        FROM cast_members WHERE cast_member is not null GROUP BY 1 ORDER BY first_name_qty DESC""",
+    '05':"""SELECT cast_member, count(cast_member) as qty_movies_with_woody FROM cast_members
+        WHERE show_id IN (SELECT show_id FROM cast_members WHERE cast_member = 'Woody Harrelson')
+        AND gender = 'female' GROUP BY cast_member HAVING count(cast_member) >1 ORDER BY qty_movies_with_woody DESC"""}
+NAME_KEYED_DDL = """CREATE TEMP TABLE costar_pairs (
+    cast_member text NOT NULL, costar text NOT NULL, costar_gender text NOT NULL, shows_qty bigint NOT NULL,
+    CONSTRAINT costar_pairs_pkey PRIMARY KEY (cast_member, costar, costar_gender)) ON COMMIT DROP"""
+NAME_KEYED_REFRESH = [
+    f"""INSERT INTO first_name_counts (first_name, first_name_qty)
+        SELECT {FIRST_NAME_SQL} AS first_name, :sign * COUNT(*) FROM cast_members
+        WHERE cast_member is not null AND show_id = ANY(:show_ids) GROUP BY 1
+        ON CONFLICT ON CONSTRAINT first_name_counts_pkey DO UPDATE SET
+        first_name_qty = first_name_counts.first_name_qty + EXCLUDED.first_name_qty""",
+    """INSERT INTO costar_pairs (cast_member, costar, costar_gender, shows_qty)
+        SELECT cm.cast_member, cs.cast_member, cs.gender, :sign * COUNT(*)
+        FROM (SELECT DISTINCT show_id, cast_member FROM cast_members
+              WHERE cast_member is not null AND show_id = ANY(:show_ids)) AS cm
+        JOIN cast_members cs ON cs.show_id = cm.show_id AND cs.cast_member <> cm.cast_member
+        WHERE cs.gender is not null GROUP BY cm.cast_member, cs.cast_member, cs.gender
+        ON CONFLICT ON CONSTRAINT costar_pairs_pkey DO UPDATE SET
+        shows_qty = costar_pairs.shows_qty + EXCLUDED.shows_qty"""]
+NAME_KEYED_QUERIES = {
+    '01':update_data.read_query(QUERIES['01']),
+    '05':"""SELECT costar AS cast_member, shows_qty as qty_movies_with_woody FROM costar_pairs
+        WHERE cast_member = 'Woody Harrelson' AND costar_gender = 'female' AND shows_qty >1
+        ORDER BY qty_movies_with_woody DESC, cast_member"""}
+PERSON_KEYED_REFRESH = [
+    update_data.read_query(update_data.SUMMARY_QUERIES_PATH + '/01_refresh_first_name_counts.sql'),
+    update_data.read_query(update_data.SUMMARY_QUERIES_PATH + '/03_refresh_person_costars.sql')]
+PERSON_KEYED_QUERIES = {name:update_data.read_query(query_path) for name,query_path in QUERIES.items()}
+
+
+def _load_catalogue(conn,file_path:str):
+    """Load the catalogue "file_path" in the temporary tables, genders assigned with the rule of the stub API
+    * Returns (cast_members_df, seconds spent parsing the names with update_data.split_names())
+    """
+
+    netflix_df = update_data.load_input(check_duplicates = False,file_path = file_path)
+    cast_members_df = update_data.create_cast_members_df(netflix_df)
+    names = pd.Series(cast_members_df.cast_member.dropna().unique())
+    gender_df = pd.DataFrame({'cast_member':names,'gender':names.map(stub_gender)})
+    t_start = perf_counter()
+    update_data.split_names(cast_members_df.cast_member)
+    parse_s = perf_counter() - t_start
+    update_data.update_table_title(netflix_df,conn = conn)
+    update_data.update_tables_movies_tv_shows(netflix_df,conn = conn)
+    update_data.update_table_cast_members(cast_members_df,gender_df,conn = conn)
+    update_data.update_dimension_tables(netflix_df,cast_members_df,gender_df,conn)
+
+    return cast_members_df, parse_s
+
+
+def _time_queries(conn,queries:dict,cast_member:str,repeat:int):
+    """Returns {query name: best wall time of "repeat" runs}, query 05 looking up "cast_member"
+    """
+
+    timings = {}
+    for name,query in queries.items():
+        query = text(query.replace('Woody Harrelson',cast_member.replace("'","''")))
+        runs = []
+        for _ in range(repeat):
+            t_start = perf_counter()
+            conn.execute(query).fetchall()
+            runs.append(perf_counter() - t_start)
+        timings[name] = min(runs)
+
+    return timings
+
+
+def _time_refresh(conn,refresh_queries:list,show_ids:list,signs:tuple = (1,)):
+    """Returns the wall time of "refresh_queries" for the titles "show_ids", once per sign
+    """
+
+    t_start = perf_counter()
+    for sign in signs:
+        for query in refresh_queries:
+            conn.execute(text(query),{'show_ids':show_ids,'sign':sign})
+
+    return perf_counter() - t_start
+
+
+def _gender_batch_show_ids(
+        cast_members_df:pd.DataFrame,batch_size:int = gender_worker.DEFAULT_BATCH_SIZE,seed:int = 0):
+    """Returns the titles of "batch_size" names drawn at random, the titles of a batch of the gender worker
+    """
+
+    names = pd.Series(cast_members_df.cast_member.dropna().unique()).sample(batch_size,random_state = seed)
+
+    return cast_members_df.show_id[cast_members_df.cast_member.isin(names)].unique().tolist()
+
+
+def run_benchmark(titles_qty:int = 10*SAMPLE_TITLES,repeat:int = 3,seed:int = 0):
+    """Returns (DataFrame with the refresh and query times of each variant, cast member looked up by query 05)
+    """
+
+    conn = update_data.create_connection()
+    transaction = conn.begin()
+    try:
+        for table_name in BENCHMARK_TABLES:
+            conn.execute(f'CREATE TEMP TABLE {table_name} (LIKE public.{table_name} INCLUDING ALL) ON COMMIT DROP')
+        conn.execute(NAME_KEYED_DDL)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir,f'netflix_titles_{titles_qty}.csv')
+            write_catalogue(file_path,titles_qty,seed)
+            cast_members_df, parse_s = _load_catalogue(conn,file_path)
+        show_ids = cast_members_df.show_id.unique().tolist()
+        batch_show_ids = _gender_batch_show_ids(cast_members_df,seed = seed)
+        conn.execute('ANALYZE ' + ', '.join(BENCHMARK_TABLES))
+        cast_member = conn.execute(
+            'SELECT cast_member FROM cast_members WHERE cast_member is not null '
+            'GROUP BY cast_member ORDER BY COUNT(*) DESC, cast_member LIMIT 1').scalar()
+
+        rows = []
+        # Gender backfill: costar_pairs is keyed by co-star gender, the worker subtracted and added back the titles
+        # of each batch; no person_keyed table depends on the genders
+        for variant,refresh_queries,gender_refresh_queries,queries in [
+                ('on_the_fly',[],[],ON_THE_FLY_QUERIES),
+                ('name_keyed',NAME_KEYED_REFRESH,NAME_KEYED_REFRESH,NAME_KEYED_QUERIES),
+                ('person_keyed',PERSON_KEYED_REFRESH,[],PERSON_KEYED_QUERIES)]:
+            conn.execute('TRUNCATE first_name_counts, person_costars, costar_pairs')
+            refresh_s = _time_refresh(conn,refresh_queries,show_ids)
+            conn.execute('ANALYZE first_name_counts; ANALYZE person_costars; ANALYZE costar_pairs')
+            gender_batch_refresh_s = _time_refresh(conn,gender_refresh_queries,batch_show_ids,signs = (-1,1))
+            timings = _time_queries(conn,queries,cast_member,repeat)
+            rows.append({
+                'variant':variant,
+                'parse_names_s':parse_s if variant == 'person_keyed' else 0.0,
+                'refresh_s':refresh_s,
+                'gender_batch_refresh_s':gender_batch_refresh_s,
+                'query_01_ms':1000*timings['01'],
+                'query_05_ms':1000*timings['05']})
+    finally:
+        transaction.rollback()
+        conn.close()
+
+    return pd.DataFrame(rows), cast_member
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles',type = int,default = 10*SAMPLE_TITLES)
+    parser.add_argument('--repeat',type = int,default = 3)
+    parser.add_argument('--seed',type = int,default = 0)
+    args = parser.parse_args()
+
+    results_df, cast_member = run_benchmark(args.titles,args.repeat,args.seed)
+    print(f'{args.titles} titles - query 05 for {cast_member}')
+    print(results_df.round(3).to_string(index = False))
@@ -0,0 +1,80 @@
+"""Benchmark the report queries on Postgres against the offline mode (Parquet snapshot + pandas, snapshot.py)
+
+Exports a snapshot of netflix_db (which must be running and loaded), computes every report result in both modes,
+checks they are identical and prints the time of each step.
+Run from the repository root:
+    python -m benchmarks.bench_offline_report --repeat 5
+"""
+
+import argparse
+import tempfile
+from time import perf_counter
+import pandas as pd
+import output_report
+import snapshot
+import update_data
+
+
+def online_query_results():
+    """Returns the results of the data-quality and analysis queries, run on the db
+    """
+
+    queries = dict(output_report.DATA_QUALITY_QUERIES)
+    queries.update({query_path:update_data.read_query(query_path) for query_path in output_report.ANALYSIS_QUERIES})
+
+    return output_report.run_queries(queries)
+
+
+def compare_results(online_results:dict,offline_results:dict):
+    """Returns the names of the results that differ between both modes (values compared, not dtypes)
+    """
+
+    different = []
+    for query_name,online_df in online_results.items():
+        try:
+            pd.testing.assert_frame_equal(
+                online_df.reset_index(drop = True),
+                offline_results[query_name].reset_index(drop = True),
+                check_dtype = False)
+        except AssertionError:
+            different.append(query_name)
+
+    return different
+
+
+def run_benchmark(repeat:int):
+    """Returns a DataFrame with the mean time of the export and of both report modes
+    """
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = tmp_dir + '/snapshot'
+        conn = update_data.create_connection()
+        t_start = perf_counter()
+        snapshot.export_snapshot(conn,snapshot_path)
+        export_s = perf_counter() - t_start
+        conn.close()
+
+        online_s, offline_s = [], []
+        for i in range(repeat):
+            t_start = perf_counter()
+            online_results = online_query_results()
+            online_s.append(perf_counter() - t_start)
+            t_start = perf_counter()
+            offline_results = snapshot.offline_query_results(output_report.ANALYSIS_QUERIES,snapshot_path)
+            offline_s.append(perf_counter() - t_start)
+
+    different = compare_results(online_results,offline_results)
+    print('Results identical in both modes' if not different else f'Results differ: {different}')
+
+    return pd.DataFrame([
+        {'step':'export_snapshot','mean_s':export_s},
+        {'step':'report_queries_postgres','mean_s':sum(online_s)/repeat},
+        {'step':'report_queries_offline','mean_s':sum(offline_s)/repeat}])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat',type = int,default = 5)
+    args = parser.parse_args()
+
+    print(run_benchmark(args.repeat).to_string(index = False))
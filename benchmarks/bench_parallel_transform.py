@@ -0,0 +1,72 @@
+"""Benchmark the scaling of the parallel transform (parallel_transform.py) with the number of worker processes
+
+A synthetic catalogue (benchmarks/synthetic_catalogue.py) is read with load_input() and transformed with
+update_data.transform_titles() (movies/tv_shows and cast_members) for each number of workers: 1 runs the serial
+transforms. Each parallel result is checked against the serial one.
+Run from the repository root (speedups are bounded by the cores of the machine):
+    python -m benchmarks.bench_parallel_transform --titles 2000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+from time import perf_counter
+import pandas as pd
+from benchmarks import synthetic_catalogue
+import update_data
+
+
+def check_same_results(expected:tuple,result:tuple):
+    """Raises AssertionError if two results of transform_titles() have different records
+    * The parallel results are grouped by partition: titles are compared by index, cast members by show_id
+      (the names of a title keep their order)
+    """
+
+    for title_type,titles_df in expected[0].items():
+        pd.testing.assert_frame_equal(titles_df.sort_index(),result[0][title_type].sort_index())
+    pd.testing.assert_frame_equal(
+        expected[1].sort_values('show_id',kind = 'stable',ignore_index = True),
+        result[1].sort_values('show_id',kind = 'stable',ignore_index = True))
+
+
+def run_benchmark(titles_qty:int,workers_list:list,repeat:int = 1,seed:int = 0):
+    """Returns a DataFrame with the best wall time, titles/sec and speedup over 1 worker of each number of workers
+    """
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir,f'netflix_titles_{titles_qty}.csv')
+        synthetic_catalogue.write_catalogue(file_path,titles_qty,seed)
+        netflix_df = update_data.load_input(False,file_path)
+
+    rows = []
+    expected = None
+    for workers in sorted(set([1] + workers_list)):
+        timings = []
+        for _ in range(repeat):
+            t_start = perf_counter()
+            result = update_data.transform_titles(netflix_df,workers)
+            timings.append(perf_counter() - t_start)
+        if expected is None:
+            expected = result
+        else:
+            check_same_results(expected,result)
+        rows.append({'workers':workers,'wall_s':min(timings),'titles_per_s':titles_qty/min(timings)})
+
+    results_df = pd.DataFrame(rows)
+    results_df['speedup'] = results_df.wall_s[results_df.workers == 1].iloc[0]/results_df.wall_s
+    results_df['efficiency'] = results_df.speedup/results_df.workers
+
+    return results_df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles',type = int,default = 2_000_000)
+    parser.add_argument('--workers',type = int,nargs = '+',default = [1,2,4,8])
+    parser.add_argument('--repeat',type = int,default = 1)
+    parser.add_argument('--seed',type = int,default = 0)
+    args = parser.parse_args()
+
+    results_df = run_benchmark(args.titles,args.workers,args.repeat,args.seed)
+    print(f'{args.titles} titles - {os.cpu_count()} cores')
+    print(results_df.round(2).to_string(index = False))
@@ -0,0 +1,67 @@
+"""Check that each analysis query uses its indexes (sql_queries/DDL_queries/06_create_indexes.sql and summary tables keys)
+
+Runs EXPLAIN (ANALYZE, FORMAT JSON) for every query in output_report.ANALYSIS_QUERIES and lists the indexes in the plan.
+With the sample dataset the tables are small enough that the planner rightly prefers sequential scans,
+so by default sequential scans are disabled to check the indexes are usable; --allow-seqscan shows the actual plans.
+netflix_db must be running and loaded. Run from the repository root:
+    python -m benchmarks.explain_analysis_queries
+"""
+
+import argparse
+import os
+import sys
+import pandas as pd
+import update_data
+from output_report import ANALYSIS_QUERIES
+
+# 03 reads a whole summary table (one row per day), no index needed
+EXPECTED_INDEXES = {
+    '01_most_common_first_name.sql':{'first_name_counts_qty_idx'},
+    '02_movie_with_longest_timespan.sql':{'movies_show_id_idx'},
+    '03_month_most_new_releases.sql':set(),
+    '04_tv_shows_largest_increase_year_on_year.sql':{'titles_added_daily_pkey'},
+    '05_actresses_more_than_one_movie_with_wood.sql':{'people_person_name_key','person_costars_repeated_idx','people_pkey'}}
+
+
+def plan_indexes(plan:dict):
+    """Returns the set of index names used by the nodes of a JSON query plan
+    """
+
+    indexes = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child_plan in plan.get('Plans',[]):
+        indexes |= plan_indexes(child_plan)
+
+    return indexes
+
+
+def explain_queries(queries_paths:list = ANALYSIS_QUERIES,allow_seqscan:bool = False):
+    """Returns a DataFrame with execution time, indexes used and missing expected indexes of each query
+    """
+
+    results = []
+    with update_data.get_engine().begin() as conn:
+        conn.execute('ANALYZE titles; ANALYZE movies; ANALYZE tv_shows; ANALYZE cast_members; ANALYZE people')
+        if not allow_seqscan:
+            conn.execute('SET LOCAL enable_seqscan = off') # only for this transaction
+        for query_path in queries_paths:
+            query_name = os.path.basename(query_path)
+            plan = conn.execute('EXPLAIN (ANALYZE, FORMAT JSON) ' + update_data.read_query(query_path)).scalar()[0]
+            indexes = plan_indexes(plan['Plan'])
+            results.append({
+                'query':query_name,
+                'execution_ms':plan['Execution Time'],
+                'indexes_used':', '.join(sorted(indexes)) or '-',
+                'missing_indexes':', '.join(sorted(EXPECTED_INDEXES.get(query_name,set()) - indexes)) or '-'})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--allow-seqscan',action = 'store_true')
+    args = parser.parse_args()
+
+    results_df = explain_queries(allow_seqscan = args.allow_seqscan)
+    print(results_df.to_string(index = False))
+    if not args.allow_seqscan and (results_df.missing_indexes != '-').any():
+        sys.exit('Some analysis queries do not use their indexes')
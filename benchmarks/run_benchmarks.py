@@ -0,0 +1,224 @@
+"""Reproducible benchmark of the whole pipeline on synthetic catalogues (benchmarks/synthetic_catalogue.py)
+
+For each scale (--titles) a catalogue is generated and every stage is timed with instrumentation.py:
+load_input, transform_titles, transform_movies_tv_shows, create_cast_members_df, gender_lookup
+(stub API, benchmarks/stub_gender_server.py, up to --gender-max-titles), db_load, summary_refresh and
+report_queries.
+The db stages run on temporary copies of the tables (CREATE TEMP TABLE ... LIKE, which shadow the real ones
+in the session) inside a transaction that is rolled back, so netflix_db is left untouched.
+Results are saved as JSON in benchmarks/results/; --compare checks them against a previous run and
+exits with an error if a stage got slower than --threshold.
+netflix_db must be running (unless --skip-db). Run from the repository root:
+    python -m benchmarks.run_benchmarks --titles 10000 100000 --repeat 3
+    python -m benchmarks.run_benchmarks --titles 10000 100000 --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+import pandas as pd
+import data_quality
+import instrumentation
+import update_data
+from output_report import ANALYSIS_QUERIES
+from benchmarks.stub_gender_server import start_stub_server, stub_gender
+from benchmarks.synthetic_catalogue import build_profile, write_catalogue
+
+RESULTS_PATH = 'benchmarks/results'
+BENCHMARK_TABLES = [
+    'titles','movies','tv_shows','cast_members','first_name_counts','titles_added_daily','person_costars',
+    'people','genres','countries','title_people','title_genres','title_countries']
+METRICS = ['wall_s','cpu_s','rows','rows_per_s','peak_rss_mb']
+
+
+def _create_temp_tables(conn):
+    """Create empty temporary copies of the tables, used instead of the real ones until the transaction ends
+    """
+
+    for table_name in BENCHMARK_TABLES:
+        conn.execute(f'CREATE TEMP TABLE {table_name} (LIKE public.{table_name} INCLUDING ALL) ON COMMIT DROP')
+
+
+def _run_db_stages(netflix_df:pd.DataFrame,cast_members_df:pd.DataFrame,gender_df:pd.DataFrame):
+    """Load, refresh the summary tables and run the report queries on temporary tables (rolled back at the end)
+    """
+
+    conn = update_data.create_connection()
+    transaction = conn.begin()
+    try:
+        _create_temp_tables(conn)
+        with instrumentation.stage('db_load',rows_in = len(netflix_df) + len(cast_members_df)):
+            update_data.update_table_title(netflix_df,conn = conn)
+            update_data.update_tables_movies_tv_shows(netflix_df,conn = conn)
+            update_data.update_table_cast_members(cast_members_df,gender_df,conn = conn)
+            update_data.update_dimension_tables(netflix_df,cast_members_df,gender_df,conn)
+        with instrumentation.stage('summary_refresh',rows_in = len(netflix_df)):
+            update_data.refresh_summary_tables(netflix_df.show_id,conn)
+            conn.execute('ANALYZE ' + ', '.join(BENCHMARK_TABLES))
+        # Same connection as the temporary tables (output_report.run_queries() would use other sessions)
+        queries = dict(data_quality.build_quality_queries())
+        queries.update({query_path:update_data.read_query(query_path) for query_path in ANALYSIS_QUERIES})
+        with instrumentation.stage('report_queries') as record:
+            record['rows_out'] = sum(len(pd.read_sql_query(query,conn)) for query in queries.values())
+    finally:
+        transaction.rollback()
+        conn.close()
+
+
+def run_scale(file_path:str,log_dir:str,gender_api_url:str = None,skip_db:bool = False):
+    """Run every stage once on the catalogue "file_path" and returns the top-level stage records
+    * gender_api_url None skips the API requests (stage gender_local_rule): genders are assigned locally with
+      the rule of the stub, so the db stages (query 05 filters the co-stars by gender) stay comparable
+    """
+
+    with instrumentation.pipeline_run('benchmark',log_dir = log_dir) as run:
+        netflix_df = update_data.load_input(check_duplicates = False,file_path = file_path)
+        with instrumentation.stage('transform_titles',rows_in = len(netflix_df)):
+            update_data.update_table_title(netflix_df,update_db = False)
+        with instrumentation.stage('transform_movies_tv_shows',rows_in = len(netflix_df)):
+            update_data.split_titles_by_type(netflix_df)
+        cast_members_df = update_data.create_cast_members_df(netflix_df)
+        gender_stage = 'gender_lookup' if gender_api_url is not None else 'gender_local_rule'
+        with instrumentation.stage(gender_stage,rows_in = cast_members_df.cast_member.nunique()):
+            if gender_api_url is not None:
+                gender_df = update_data.async_gender_request(
+                    cast_members_df,
+                    concurrency = 100,
+                    rate_limit = 1_000_000, # the stub is local: measure the client, not the API quota
+                    use_cache = False,
+                    api_url = gender_api_url)
+            else:
+                names = pd.Series(cast_members_df.cast_member.dropna().unique())
+                gender_df = pd.DataFrame({'cast_member':names,'gender':names.map(stub_gender)})
+        if not skip_db:
+            _run_db_stages(netflix_df,cast_members_df,gender_df)
+
+    return [record for record in run['stages'] if record['depth'] == 0]
+
+
+def _git_commit():
+    """Returns the current git commit (None outside a git repository)
+    """
+
+    try:
+        return subprocess.run(
+            ['git','rev-parse','--short','HEAD'],capture_output = True,text = True,check = True).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+        titles_scales:list,
+        repeat:int = 1,
+        seed:int = 0,
+        gender_max_titles:int = 10_000,
+        skip_db:bool = False,
+        stub_latency_s:float = 0):
+    """Returns the benchmark results (dict saved as JSON): one row per scale and stage, median of "repeat" runs
+    * The gender lookup only requests the stub API for scales up to "gender_max_titles" (one request per distinct
+      name, ~1200 requests/s)
+    * peak_rss_mb is the process peak so far, so scales run in increasing order
+    """
+
+    server, api_url = start_stub_server(latency_s = stub_latency_s)
+    profile = build_profile()
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for titles_qty in sorted(titles_scales):
+                file_path = os.path.join(tmp_dir,f'netflix_titles_{titles_qty}.csv')
+                with instrumentation.stage('generate_catalogue',rows_in = titles_qty):
+                    write_catalogue(file_path,titles_qty,seed = seed,profile = profile)
+                records = []
+                for i in range(repeat):
+                    records += run_scale(
+                        file_path,
+                        tmp_dir,
+                        gender_api_url = api_url if titles_qty <= gender_max_titles else None,
+                        skip_db = skip_db)
+                os.remove(file_path)
+                stages_df = pd.DataFrame(records)
+                stages_df['rows'] = stages_df.rows_out.fillna(stages_df.rows_in)
+                medians_df = stages_df.groupby('name',sort = False)[METRICS].median()
+                for stage_name,metrics in medians_df.iterrows():
+                    rows.append({'titles':titles_qty,'stage':stage_name,**metrics.dropna().to_dict()})
+    finally:
+        server.shutdown()
+
+    return {
+        'created_at':datetime.today().isoformat(),
+        'git_commit':_git_commit(),
+        'python':platform.python_version(),
+        'pandas':pd.__version__,
+        'platform':platform.platform(),
+        'options':{
+            'titles':sorted(titles_scales),
+            'repeat':repeat,
+            'seed':seed,
+            'gender_max_titles':gender_max_titles,
+            'skip_db':skip_db,
+            'stub_latency_s':stub_latency_s},
+        'results':rows}
+
+
+def save_results(results:dict,results_path:str = RESULTS_PATH):
+    """Write the results as benchmarks/results/benchmark_<date>.json and returns the file path
+    """
+
+    os.makedirs(results_path,exist_ok = True)
+    file_path = os.path.join(
+        results_path,f"benchmark_{datetime.today().strftime(r'%Y-%m-%d %H.%M.%S')}.json")
+    with open(file_path,'w',encoding = 'utf-8') as f:
+        json.dump(results,f,indent = 2)
+
+    return file_path
+
+
+def compare_results(results:dict,baseline:dict,threshold:float = 0.2,min_wall_s:float = 0.05):
+    """Returns a DataFrame comparing the wall time of each stage and scale found in both runs
+    * regression is True when the stage is more than "threshold" slower (stages under "min_wall_s" are ignored: noise)
+    """
+
+    current_df = pd.DataFrame(results['results'])[['titles','stage','wall_s']]
+    baseline_df = pd.DataFrame(baseline['results'])[['titles','stage','wall_s']]
+    comparison_df = baseline_df.merge(current_df,on = ['titles','stage'],suffixes = ('_baseline','_current'))
+    comparison_df['change'] = comparison_df.wall_s_current/comparison_df.wall_s_baseline - 1
+    comparison_df['regression'] = \
+        (comparison_df.change > threshold) & (comparison_df.wall_s_baseline >= min_wall_s)
+
+    return comparison_df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles',type = int,nargs = '+',default = [10_000,100_000])
+    parser.add_argument('--repeat',type = int,default = 1)
+    parser.add_argument('--seed',type = int,default = 0)
+    parser.add_argument('--gender-max-titles',type = int,default = 10_000)
+    parser.add_argument('--skip-db',action = 'store_true')
+    parser.add_argument('--stub-latency-s',type = float,default = 0)
+    parser.add_argument('--compare',help = 'results JSON of a previous run (baseline)')
+    parser.add_argument('--threshold',type = float,default = 0.2,help = 'max slowdown of a stage (0.2: 20%%)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.titles,
+        repeat = args.repeat,
+        seed = args.seed,
+        gender_max_titles = args.gender_max_titles,
+        skip_db = args.skip_db,
+        stub_latency_s = args.stub_latency_s)
+    print(pd.DataFrame(results['results']).to_string(index = False))
+    print(f'Results saved to {save_results(results)}')
+
+    if args.compare:
+        with open(args.compare,encoding = 'utf-8') as f:
+            comparison_df = compare_results(results,json.load(f),args.threshold)
+        print(comparison_df.to_string(index = False))
+        if comparison_df.regression.any():
+            sys.exit(f'Stages slower than the baseline by more than {args.threshold:.0%}')
@@ -0,0 +1,104 @@
+"""Local stub of the gender API (same payload as https://innovaapi.aminer.cn/tools/v1/predict/gender)
+
+Injects latency and failures, so the gender lookup can be tested and benchmarked offline:
+* every response waits "latency_s" (+/- 50% jitter)
+* "failure_rate" of the requests answer 503 at random
+* names in "always_fail_names" always answer 500
+
+Run from the repository root:
+    python -m benchmarks.stub_gender_server --port 8765 --latency-s 0.2 --failure-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from urllib.parse import parse_qs, urlparse
+
+
+def stub_gender(name:str):
+    """Returns the gender answered by the stub for "name": first names ending with "a" are female
+    """
+
+    return 'female' if name.split(' ')[0].lower().endswith('a') else 'male'
+
+
+class StubGenderServer(ThreadingHTTPServer):
+    """HTTP server holding the latency/failure settings and a request counter
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self,address:tuple,latency_s:float = 0,failure_rate:float = 0,always_fail_names:set = None,seed:int = 0):
+        super().__init__(address,StubGenderHandler)
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.always_fail_names = always_fail_names or set()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests_qty = 0
+
+
+class StubGenderHandler(BaseHTTPRequestHandler):
+    """Answers GET ?name=<name> like the gender API, with the gender of stub_gender()
+    """
+
+    protocol_version = 'HTTP/1.1' # keep-alive, so pooled sessions reuse connections
+
+    def do_GET(self):
+        server = self.server
+        name = parse_qs(urlparse(self.path).query).get('name',[''])[0]
+        with server.lock:
+            server.requests_qty += 1
+            failed = server.random.random() < server.failure_rate
+            latency_s = server.latency_s*server.random.uniform(0.5,1.5)
+        sleep(latency_s)
+
+        if name in server.always_fail_names:
+            self._send(500,{'error':'internal error'})
+        elif failed:
+            self._send(503,{'error':'service unavailable'})
+        else:
+            self._send(200,{'data':{'Final':{'gender':stub_gender(name)}}})
+
+
+    def _send(self,status:int,payload:dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self,format,*args):
+        # Silence the default per-request log line
+        pass
+
+
+def start_stub_server(port:int = 0,**kwargs):
+    """Start a StubGenderServer in a background thread and returns (server, api_url)
+    * port 0 picks a free port
+    * call server.shutdown() to stop it
+    """
+
+    server = StubGenderServer(('127.0.0.1',port),**kwargs)
+    threading.Thread(target = server.serve_forever,daemon = True).start()
+    api_url = f'http://127.0.0.1:{server.server_address[1]}/tools/v1/predict/gender'
+
+    return server, api_url
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port',type = int,default = 8765)
+    parser.add_argument('--latency-s',type = float,default = 0.2)
+    parser.add_argument('--failure-rate',type = float,default = 0.05)
+    args = parser.parse_args()
+
+    server = StubGenderServer(('127.0.0.1',args.port),latency_s = args.latency_s,failure_rate = args.failure_rate)
+    print(f'Stub gender API on http://127.0.0.1:{args.port}/tools/v1/predict/gender')
+    server.serve_forever()
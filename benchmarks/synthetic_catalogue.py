@@ -0,0 +1,114 @@
+"""Synthetic netflix_titles.csv-shaped catalogue at any scale (benchmarks/run_benchmarks.py)
+
+* type, director, country, date_added, release_year, rating, duration, listed_in and description are resampled
+  together from rows of the real input, so formats ("August 14, 2020", "93 min", "4 Seasons") and their
+  combinations stay realistic
+* cast lists follow the cast-length distribution of the real input (~9% of titles without cast)
+* cast names are drawn from a universe of ACTORS_UNIVERSE_PER_TITLE actors per title, built from real
+  first and last names, with a skewed popularity: like the real input, ~4.2 distinct cast members per title
+  and a few actors in dozens of titles
+Run from the repository root:
+    python -m benchmarks.synthetic_catalogue --titles 1000000 --output /tmp/netflix_titles_1m.csv
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+REFERENCE_PATH = 'input_data/netflix_titles.csv'
+ACTORS_UNIVERSE_PER_TITLE = 7 # ~4.2 of them appear (distinct cast members / titles of the real input)
+POPULARITY_SKEW = 1.5 # actor id = universe size * uniform**skew, higher: a few actors in more titles
+NAME_HASH_MULTIPLIER = 2_654_435_761 # prime, coprime with the number of first + last name combinations
+RESAMPLED_COLS = [
+    'type','director','country','date_added','release_year','rating','duration','listed_in','description']
+
+
+def build_profile(reference_path:str = REFERENCE_PATH):
+    """Returns the distributions of the real input used by generate_catalogue()
+    """
+
+    reference_df = pd.read_csv(reference_path)
+    cast_names = reference_df.cast.str.split(',').explode().str.strip().dropna()
+    name_parts = cast_names.str.partition(' ')
+
+    return {
+        'rows':reference_df[RESAMPLED_COLS].reset_index(drop = True),
+        'cast_lengths':reference_df.cast.str.split(',').str.len().fillna(0).astype('int64').to_numpy(),
+        'first_names':name_parts[0].drop_duplicates().to_numpy(dtype = object),
+        'last_names':name_parts[2][name_parts[2] != ''].drop_duplicates().to_numpy(dtype = object)}
+
+
+def actor_names(actor_ids:np.ndarray,profile:dict):
+    """Returns the (unique) name of each actor id: first name + last name, plus a number once combinations run out
+    """
+
+    first_names, last_names = profile['first_names'], profile['last_names']
+    combinations_qty = len(first_names)*len(last_names)
+    # Multiplicative hash (bijective on [0, combinations_qty)): consecutive ids get unrelated first and last names
+    combination = (actor_ids % combinations_qty)*NAME_HASH_MULTIPLIER % combinations_qty
+    names = pd.Series(first_names[combination % len(first_names)]) + ' ' + \
+        pd.Series(last_names[combination//len(first_names)])
+    generation = actor_ids//combinations_qty
+    names[generation > 0] = names[generation > 0] + ' ' + (generation[generation > 0] + 1).astype(str)
+
+    return names.to_numpy()
+
+
+def generate_catalogue(titles_qty:int,seed:int = 0,start_id:int = 1,universe_titles:int = None,profile:dict = None):
+    """Returns a DataFrame with the columns of netflix_titles.csv and "titles_qty" synthetic titles
+    * show_ids are s<start_id> to s<start_id + titles_qty - 1>
+    * universe_titles: size of the whole catalogue when it is generated in chunks (actor universe size)
+    """
+
+    profile = profile if profile is not None else build_profile()
+    rng = np.random.default_rng([seed,start_id])
+    universe_titles = universe_titles or titles_qty
+    actors_qty = max(int(universe_titles*ACTORS_UNIVERSE_PER_TITLE),1)
+
+    catalogue_df = profile['rows'].iloc[rng.integers(0,len(profile['rows']),titles_qty)].reset_index(drop = True)
+    show_numbers = np.arange(start_id,start_id + titles_qty)
+    catalogue_df.insert(0,'show_id','s' + pd.Series(show_numbers).astype(str))
+    catalogue_df.insert(2,'title','Synthetic title ' + pd.Series(show_numbers).astype(str))
+
+    # Cast lists: lengths from the real distribution, actors with a skewed popularity
+    cast_lengths = profile['cast_lengths'][rng.integers(0,len(profile['cast_lengths']),titles_qty)]
+    actor_ids = (actors_qty*rng.random(cast_lengths.sum())**POPULARITY_SKEW).astype('int64')
+    names = actor_names(actor_ids,profile)
+    with_cast = cast_lengths > 0
+    ends = np.cumsum(cast_lengths)[with_cast]
+    names[:] = names + ', '
+    names[ends - 1] = [name[:-2] for name in names[ends - 1]] # no separator after the last name of each title
+    cast = np.full(titles_qty,np.nan,dtype = object) # titles without cast: NaN
+    if len(ends) != 0:
+        cast[with_cast] = np.add.reduceat(names,ends - cast_lengths[with_cast]) # string concatenation per title
+    catalogue_df.insert(4,'cast',cast)
+
+    return catalogue_df
+
+
+def write_catalogue(file_path:str,titles_qty:int,seed:int = 0,chunk_size:int = 500_000,profile:dict = None):
+    """Write a synthetic catalogue of "titles_qty" titles to the csv "file_path", "chunk_size" titles at a time
+    """
+
+    profile = profile if profile is not None else build_profile()
+    for start in range(0,titles_qty,chunk_size):
+        chunk_df = generate_catalogue(
+            min(chunk_size,titles_qty - start),
+            seed = seed,
+            start_id = start + 1,
+            universe_titles = titles_qty,
+            profile = profile)
+        chunk_df.to_csv(file_path,mode = 'w' if start == 0 else 'a',header = start == 0,index = False)
+
+    return file_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles',type = int,default = 10_000)
+    parser.add_argument('--seed',type = int,default = 0)
+    parser.add_argument('--output',default = 'netflix_titles_synthetic.csv')
+    args = parser.parse_args()
+
+    write_catalogue(args.output,args.titles,seed = args.seed)
+    print(f'{args.titles} titles written to {args.output}')
@@ -0,0 +1,66 @@
+"""Bulk load of DataFrames into database tables, used by the update_table_* functions in update_data.py
+
+* PostgreSQL: rows are streamed with COPY ... FROM STDIN, one in-memory CSV chunk at a time
+* Other engines: fallback to DataFrame.to_sql(method='multi'), also chunked
+"""
+
+import io
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 50_000
+NULL_MARKER = r'\N' # distinguishes NULL from empty strings in the CSV buffer
+
+
+def _prepare_copy_chunk(chunk_df:pd.DataFrame):
+    """Returns the chunk with float columns holding only whole numbers converted to nullable integers
+    * pandas stores int columns with NaN as float, and Postgres would reject "90.0" for an int column
+    """
+
+    int_cols = {}
+    for col in chunk_df.columns:
+        values = chunk_df[col]
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            int_cols[col] = 'Int64'
+
+    return chunk_df.astype(int_cols) if int_cols else chunk_df
+
+
+def copy_df_to_table(df:pd.DataFrame,table_name:str,conn,chunk_size:int = DEFAULT_CHUNK_SIZE):
+    """Append the rows of "df" to "table_name" and returns the number of rows loaded
+    * "conn" is a SQLAlchemy connection, if it is already in a transaction the load is part of it
+    * Memory stays flat: only one chunk of "chunk_size" rows is serialized at a time
+    """
+
+    if conn.dialect.name != 'postgresql':
+        df.to_sql(
+            name = table_name,
+            con = conn,
+            if_exists='append',
+            index=False,
+            method='multi',
+            chunksize = chunk_size)
+        return len(df)
+
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    copy_query = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')"
+    # COPY goes through the DBAPI (psycopg2) connection, inside the SQLAlchemy transaction
+    transaction = None if conn.in_transaction() else conn.begin()
+    try:
+        with conn.connection.cursor() as cursor:
+            for start in range(0,len(df),chunk_size):
+                buffer = io.StringIO()
+                _prepare_copy_chunk(df.iloc[start:start + chunk_size]).to_csv(
+                    buffer,
+                    index = False,
+                    header = False,
+                    na_rep = NULL_MARKER)
+                buffer.seek(0)
+                cursor.copy_expert(copy_query,buffer)
+    except:
+        if transaction is not None:
+            transaction.rollback()
+        raise
+    if transaction is not None:
+        transaction.commit()
+
+    return len(df)
@@ -0,0 +1,138 @@
+"""Declarative data-quality rules, used by output_report.py for the null values and invalid data reports
+
+Each table is scanned only once: build_quality_query() combines all the rules of a table in a single
+aggregate query, whose result drives both reports (see report_metrics()).
+Adding a check means adding a rule to DATA_QUALITY_RULES, not another query.
+Each rule also has a pandas version, used by the offline reports (snapshot.offline_quality_results()).
+"""
+
+from collections import namedtuple
+import pandas as pd
+
+QUALITY_TABLES = ['titles','movies','tv_shows','cast_members']
+
+# report: 'null_values' or 'invalid_data' - metric: column name in the report - expression: SQL aggregate
+# evaluate: same metric computed from a DataFrame of the table (offline reports, see snapshot.py)
+QualityRule = namedtuple('QualityRule',['table','report','metric','expression','evaluate'])
+
+
+def _percent(qty_expression:str,denominator:str = 'count(*)'):
+    """Returns the SQL expression of "qty_expression" as a percentage of "denominator"
+    """
+
+    return f'CAST(100 AS FLOAT)*{qty_expression}/{denominator}'
+
+
+def null_rules(table_name:str,columns:list,per_title:bool = False):
+    """Returns the null values rules of a table: quantity and percentage of NULL for each column
+    * If per_title == True percentages are relative to the number of titles (distinct show_id), not of records
+    """
+
+    if per_title:
+        denominator, count_df = 'COUNT(DISTINCT show_id)', lambda df: df.show_id.nunique()
+    else:
+        denominator, count_df = 'count(*)', len
+    rules = []
+    for col in columns:
+        null_qty = f'(COUNT(*) - COUNT({col}))'
+        rules.append(QualityRule(
+            table_name,'null_values',f'{col}_null_qty',null_qty,
+            lambda df,col = col: df[col].isna().sum()))
+        rules.append(QualityRule(
+            table_name,'null_values',f'{col}_null_percent',_percent(null_qty,denominator),
+            lambda df,col = col: 100*df[col].isna().sum()/count_df(df)))
+
+    return rules
+
+
+def invalid_rules(table_name:str,metric:str,condition:str,condition_df,with_percent:bool = False):
+    """Returns the invalid data rules counting the records matching "condition" (SQL) / "condition_df" (DataFrame -> bool Series)
+    * If with_percent == True a "_percent" rule is added, with the metric name ending in "_qty"
+    """
+
+    invalid_qty = f'sum(case when {condition} then 1 else 0 end)'
+    rules = [QualityRule(table_name,'invalid_data',metric,invalid_qty,lambda df: condition_df(df).sum())]
+    if with_percent:
+        rules.append(QualityRule(
+            table_name,'invalid_data',metric.replace('_qty','_percent'),_percent(invalid_qty),
+            lambda df: 100*condition_df(df).sum()/len(df)))
+
+    return rules
+
+
+def _date_rules(table_name:str):
+    """Returns the invalid data rules shared by movies and tv_shows (release_year and date_added)
+    """
+
+    return (
+        invalid_rules(
+            table_name,'invalid_release_year',
+            "(release_year <1900 or release_year >date_part('year', CURRENT_DATE))",
+            lambda df: (df.release_year < 1900) | (df.release_year > pd.Timestamp.now().year))
+        + invalid_rules(
+            table_name,'invalid_date_added',
+            "(date_added <'1997-01-01' or date_added > now())",
+            lambda df: (df.date_added < '1997-01-01') | (df.date_added > pd.Timestamp.now()))
+        + invalid_rules(
+            table_name,'invalid_added_release_timespan',
+            "(date_part('year', date_added) - release_year) <0",
+            lambda df: (df.date_added.dt.year - df.release_year) < 0))
+
+
+DATA_QUALITY_RULES = (
+    null_rules('titles',['show_id','type','title','director','country','rating','listed_in','description'])
+    + null_rules('movies',['show_id','date_added','release_year','movie_length_min'])
+    + null_rules('tv_shows',['show_id','date_added','release_year','season_qty'])
+    + null_rules('cast_members',['show_id','cast_member','gender'],per_title = True)
+    # Table titles
+    + [QualityRule(
+        'titles','invalid_data','invalid_title_type_qty',
+        "COUNT(*) FILTER (WHERE type <> 'TV Show' AND type <> 'Movie')",
+        lambda df: (df.type.notna() & ~df.type.isin(['TV Show','Movie'])).sum())]
+    # Table movies
+    + invalid_rules(
+        'movies','invalid_movie_length','(movie_length_min <0 or movie_length_min >500)',
+        lambda df: (df.movie_length_min < 0) | (df.movie_length_min > 500))
+    + _date_rules('movies')
+    # Table tv_shows
+    + invalid_rules(
+        'tv_shows','invalid_season_qty','(season_qty <0 or season_qty >30)',
+        lambda df: (df.season_qty < 0) | (df.season_qty > 30))
+    + _date_rules('tv_shows')
+    # Table cast_members
+    + invalid_rules(
+        'cast_members','gender_unknown_qty',"gender = 'UNKNOWN'",
+        lambda df: df.gender == 'UNKNOWN',with_percent = True)
+    + invalid_rules(
+        'cast_members','gender_request_failed_qty',"gender = 'request_failed'",
+        lambda df: df.gender == 'request_failed',with_percent = True)
+    + invalid_rules(
+        'cast_members','gender_pending_qty',"gender = 'pending'",
+        lambda df: df.gender == 'pending',with_percent = True))
+
+
+def build_quality_query(table_name:str,rules:list = DATA_QUALITY_RULES):
+    """Returns one aggregate query computing every rule of "table_name" in a single table scan
+    """
+
+    select_list = ',\n\t'.join(
+        f'{rule.expression} AS {rule.metric}'
+        for rule in rules if rule.table == table_name)
+
+    return f'SELECT \n\t{select_list}\nFROM \n\t{table_name}'
+
+
+def build_quality_queries(rules:list = DATA_QUALITY_RULES):
+    """Returns a dict {table_name: query} with the combined query of each table in QUALITY_TABLES
+    """
+
+    return {table_name:build_quality_query(table_name,rules) for table_name in QUALITY_TABLES}
+
+
+def report_metrics(quality_df:pd.DataFrame,table_name:str,report:str,rules:list = DATA_QUALITY_RULES):
+    """Returns the columns of a combined query result (quality_df) that belong to "report", in rule order
+    """
+
+    metrics = [rule.metric for rule in rules if rule.table == table_name and rule.report == report]
+
+    return quality_df.loc[:,metrics]
@@ -0,0 +1,116 @@
+"""Persistent name -> gender cache (SQLite), used by update_data.threading_gender_request()
+
+Eviction rules:
+* Resolved genders ("male", "female", "UNKNOWN") are valid for "ttl_days" after they were fetched
+* "request_failed" results are valid for "failed_ttl_hours" (default 0: the name is retried on the next run)
+* Expired entries are treated as misses and deleted by evict_expired_entries()
+"""
+
+import os
+import sqlite3
+from time import time
+import pandas as pd
+
+DEFAULT_CACHE_PATH = 'cache/gender_cache.db'
+DEFAULT_TTL_DAYS = 180
+DEFAULT_FAILED_TTL_HOURS = 0
+
+
+def create_cache_connection(cache_path:str = DEFAULT_CACHE_PATH):
+    """Returns a connection to the SQLite cache, creating the file and table if necessary
+    """
+
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir != '':
+        os.makedirs(cache_dir,exist_ok = True)
+    cache_conn = sqlite3.connect(cache_path)
+    cache_conn.execute(
+        'CREATE TABLE IF NOT EXISTS gender_cache ('
+        '   cast_member TEXT PRIMARY KEY, '
+        '   gender TEXT NOT NULL, '
+        '   fetched_at REAL NOT NULL)')
+
+    return cache_conn
+
+
+def _expiry_limits(ttl_days:float,failed_ttl_hours:float):
+    """Returns the oldest fetched_at still valid for resolved and for failed entries
+    """
+
+    now = time()
+    return now - ttl_days*24*3600, now - failed_ttl_hours*3600
+
+
+def evict_expired_entries(
+        cache_path:str = DEFAULT_CACHE_PATH,
+        ttl_days:float = DEFAULT_TTL_DAYS,
+        failed_ttl_hours:float = DEFAULT_FAILED_TTL_HOURS):
+    """Delete expired entries from the cache and returns the number of deleted entries
+    """
+
+    resolved_limit, failed_limit = _expiry_limits(ttl_days,failed_ttl_hours)
+    cache_conn = create_cache_connection(cache_path)
+    with cache_conn:
+        deleted = cache_conn.execute(
+            'DELETE FROM gender_cache '
+            'WHERE (gender <> ? AND fetched_at < ?) '
+            '   OR (gender = ? AND fetched_at <= ?)',
+            ('request_failed',resolved_limit,'request_failed',failed_limit)).rowcount
+    cache_conn.close()
+
+    return deleted
+
+
+def read_cached_genders(
+        names_list:list,
+        cache_path:str = DEFAULT_CACHE_PATH,
+        ttl_days:float = DEFAULT_TTL_DAYS,
+        failed_ttl_hours:float = DEFAULT_FAILED_TTL_HOURS):
+    """Returns a DataFrame (cast_member, gender) with the valid cache entries for the names in "names_list"
+    """
+
+    resolved_limit, failed_limit = _expiry_limits(ttl_days,failed_ttl_hours)
+    cache_conn = create_cache_connection(cache_path)
+    # Names are joined through a temp table, avoiding SQLite limits on query parameters
+    cache_conn.execute('CREATE TEMP TABLE requested_names (cast_member TEXT PRIMARY KEY)')
+    cache_conn.executemany(
+        'INSERT OR IGNORE INTO requested_names VALUES (?)',
+        [(name,) for name in names_list if name == name]) # skip NaN
+    cached_df = pd.read_sql_query(
+        'SELECT gc.cast_member, gc.gender '
+        'FROM gender_cache gc '
+        'JOIN requested_names rn ON rn.cast_member = gc.cast_member '
+        'WHERE (gc.gender <> ? AND gc.fetched_at >= ?) '
+        '   OR (gc.gender = ? AND gc.fetched_at > ?)',
+        cache_conn,
+        params = ('request_failed',resolved_limit,'request_failed',failed_limit))
+    cache_conn.close()
+
+    return cached_df
+
+
+def write_cached_genders(gender_df:pd.DataFrame,cache_path:str = DEFAULT_CACHE_PATH):
+    """Insert or refresh the cache entries for each (cast_member, gender) in "gender_df"
+    """
+
+    fetched_at = time()
+    cache_conn = create_cache_connection(cache_path)
+    with cache_conn:
+        cache_conn.executemany(
+            'INSERT OR REPLACE INTO gender_cache (cast_member, gender, fetched_at) VALUES (?, ?, ?)',
+            [(name,gender,fetched_at) for name,gender in zip(gender_df.cast_member,gender_df.gender)])
+    cache_conn.close()
+
+
+def read_api_labels(cache_path:str = DEFAULT_CACHE_PATH):
+    """Returns a DataFrame (cast_member, gender) with the cache entries labelled male or female
+    * Only API results are written to the cache (genders resolved by gender_model.py are not), whatever their age
+    """
+
+    cache_conn = create_cache_connection(cache_path)
+    labels_df = pd.read_sql_query(
+        "SELECT cast_member, gender FROM gender_cache WHERE gender IN ('male', 'female') ORDER BY cast_member",
+        cache_conn)
+    cache_conn.close()
+
+    return labels_df
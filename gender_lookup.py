@@ -0,0 +1,159 @@
+"""Asyncio gender lookup engine, used by update_data.async_gender_request()
+
+* One pooled HTTP session (aiohttp) is reused for all requests
+* Concurrency is capped by a semaphore and requests are paced by a token-bucket rate limit
+* Timeouts, connection errors, 429 and 5xx responses are retried with exponential backoff,
+  only the last failure is recorded as "request_failed"
+* Results can be checkpointed in batches as they arrive (on_batch), so an interrupted run loses at most one batch
+"""
+
+import asyncio
+import random
+from time import perf_counter
+import aiohttp
+import numpy as np
+import pandas as pd
+
+GENDER_API_URL = 'https://innovaapi.aminer.cn/tools/v1/predict/gender'
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: refills "rate" tokens per second, holding at most "capacity" tokens
+    * rate must be > 0 and capacity >= 1 (default: rate, at least 1), otherwise acquire() would never return
+    """
+
+    def __init__(self,rate:float,capacity:float = None):
+        if not rate > 0:
+            raise ValueError(f'rate must be > 0 requests per second, got {rate!r}')
+        capacity = capacity if capacity is not None else max(rate,1)
+        if not capacity >= 1:
+            raise ValueError(f'capacity must be >= 1 token, got {capacity!r}')
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated_at = perf_counter()
+        self.lock = asyncio.Lock()
+
+
+    async def acquire(self):
+        """Wait until a token is available and consume it
+        """
+
+        async with self.lock:
+            while True:
+                now = perf_counter()
+                self.tokens = min(self.capacity,self.tokens + (now - self.updated_at)*self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens)/self.rate)
+
+
+class RetryableResponse(Exception):
+    """Raised for HTTP responses worth retrying (429 and 5xx)
+    """
+
+
+async def fetch_gender(
+        session:aiohttp.ClientSession,
+        name:str,
+        semaphore:asyncio.Semaphore,
+        bucket:TokenBucket,
+        stats:dict,
+        api_url:str = GENDER_API_URL,
+        max_retries:int = 3,
+        backoff_s:float = 0.5):
+    """Returns the gender of "name" ("request_failed" if every attempt failed)
+    """
+
+    gender = 'request_failed'
+    for attempt in range(max_retries + 1):
+        if attempt > 0:
+            stats['retries'] += 1
+            # Exponential backoff with jitter, so retries of a failed burst do not arrive together
+            await asyncio.sleep(backoff_s*2**(attempt - 1)*random.uniform(0.5,1.5))
+        await bucket.acquire()
+        async with semaphore:
+            t_request = perf_counter() # latency of the HTTP request only (no queue or backoff time)
+            try:
+                async with session.get(api_url,params = {'name':name,'org':''}) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise RetryableResponse(response.status)
+                    response_json = await response.json(content_type = None)
+                gender = response_json.get('data').get('Final').get('gender')
+                break
+            # Transient errors: try again
+            except (asyncio.TimeoutError,aiohttp.ClientConnectionError,RetryableResponse):
+                continue
+            # Anything else (4xx, invalid payload) will not be fixed by a retry
+            except (aiohttp.ClientError,ValueError,AttributeError):
+                break
+            finally:
+                stats['latencies'].append(perf_counter() - t_request)
+
+    return gender
+
+
+async def lookup_genders(
+        names_list:list,
+        concurrency:int = 100,
+        rate_limit:float = 100,
+        max_retries:int = 3,
+        backoff_s:float = 0.5,
+        timeout_s:float = 30,
+        api_url:str = GENDER_API_URL,
+        on_batch = None,
+        batch_size:int = 500):
+    """Returns (gender_df, stats) for the names in "names_list" (NaN values are skipped)
+    * gender_df has the columns cast_member and gender
+    * stats has requests, retries, failed, elapsed_s, requests_per_s and p50/p95/p99 HTTP latency (seconds)
+    * on_batch(batch_df) is called with every "batch_size" results (cast_member, gender) as they arrive,
+      and with the remaining ones at the end
+    """
+
+    names_list = [name for name in names_list if name == name] # check for NaN
+    stats = {'retries':0,'latencies':[]}
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate_limit)
+    connector = aiohttp.TCPConnector(limit = concurrency)
+    timeout = aiohttp.ClientTimeout(total = timeout_s)
+    batch = []
+
+    async def fetch_and_checkpoint(session,name):
+        gender = await fetch_gender(session,name,semaphore,bucket,stats,api_url,max_retries,backoff_s)
+        if on_batch is not None:
+            batch.append((name,gender))
+            if len(batch) >= batch_size:
+                on_batch(pd.DataFrame(batch,columns = ['cast_member','gender']))
+                batch.clear()
+        return gender
+
+    t_start = perf_counter()
+    async with aiohttp.ClientSession(connector = connector,timeout = timeout) as session:
+        gender_list = await asyncio.gather(*[fetch_and_checkpoint(session,name) for name in names_list])
+    if on_batch is not None and len(batch) != 0:
+        on_batch(pd.DataFrame(batch,columns = ['cast_member','gender']))
+    elapsed_s = perf_counter() - t_start
+
+    gender_df = pd.DataFrame({'cast_member':names_list,'gender':gender_list},dtype = 'object')
+    latencies = stats.pop('latencies')
+    stats.update({
+        'requests':len(names_list),
+        'failed':int((gender_df.gender == 'request_failed').sum()),
+        'elapsed_s':elapsed_s,
+        'requests_per_s':len(names_list)/elapsed_s if elapsed_s > 0 else np.nan})
+    for percentile in [50,95,99]:
+        stats[f'p{percentile}_latency_s'] = np.percentile(latencies,percentile) if latencies else np.nan
+
+    return gender_df, stats
+
+
+def print_lookup_stats(stats:dict):
+    """Print throughput and tail latency of a lookup_genders() run
+    """
+
+    print(f"Gender lookup: {stats['requests']} requests in {stats['elapsed_s']:.2f}s "
+          f"({stats['requests_per_s']:.1f} req/s), {stats['retries']} retries, {stats['failed']} failed")
+    print(f"Gender lookup latency: p50 {stats['p50_latency_s']*1000:.0f}ms - "
+          f"p95 {stats['p95_latency_s']*1000:.0f}ms - p99 {stats['p99_latency_s']*1000:.0f}ms")
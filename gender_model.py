@@ -0,0 +1,143 @@
+"""Offline first-name gender model, used by the gender lookups in update_data.py before the API
+
+* build_first_name_model() counts, for each first name (name_normalization.first_name_key()), the names labelled
+  male/female by the gender API (read from the gender cache, gender_cache.py), optionally adding the counts of a
+  reference file. cast_members is not read: its genders include the ones resolved by this model on earlier runs
+* Only confident first names are kept: at least "min_count" labelled names and a majority gender share of at
+  least "threshold". resolve_genders() answers in bulk the names with one of these first names, the others
+  (ambiguous or unseen first names) are left to the API
+* evaluate_model() reports coverage and accuracy on the labelled names (leave-one-out: each name is resolved by
+  a model built without it). Run from the repository root:
+    python gender_model.py --thresholds 0.8 0.9 0.95 0.99 --cache-path cache/gender_cache.db
+"""
+
+import argparse
+import pandas as pd
+import gender_cache
+import name_normalization
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_MIN_COUNT = 3
+GENDERS = ['female','male']
+
+
+def read_labelled_names(cache_path:str = gender_cache.DEFAULT_CACHE_PATH):
+    """Returns a DataFrame (cast_member, gender) with the names labelled male or female by the API (gender cache)
+    """
+
+    return gender_cache.read_api_labels(cache_path)
+
+
+def _first_names(names:pd.Series):
+    """Returns the normalized first name of each name, computed once per distinct name
+    """
+
+    uniques = names.drop_duplicates()
+
+    return names.map(pd.Series(uniques.map(name_normalization.first_name_key).to_numpy(),index = uniques.to_numpy()))
+
+
+def first_name_counts(labelled_df:pd.DataFrame,reference_path:str = None):
+    """Returns a DataFrame indexed by first name with the number of "female" and "male" labelled names
+    * reference_path: csv with the columns first_name, female and male (counts), added to the counts
+    """
+
+    labelled_df = labelled_df[labelled_df.gender.isin(GENDERS)]
+    counts_df = (
+        pd.crosstab(_first_names(labelled_df.cast_member),labelled_df.gender)
+        .reindex(columns = GENDERS,fill_value = 0))
+    if reference_path is not None:
+        reference_df = pd.read_csv(reference_path)
+        reference_df['first_name'] = _first_names(reference_df.first_name)
+        reference_counts_df = reference_df.groupby('first_name')[GENDERS].sum()
+        counts_df = counts_df.add(reference_counts_df,fill_value = 0)
+    counts_df.index.name = 'first_name'
+    counts_df.columns.name = None
+
+    return counts_df.astype('int64')
+
+
+def _confident_genders(counts_df:pd.DataFrame,threshold:float,min_count:int):
+    """Returns a DataFrame (gender, confidence, total) of the first names of "counts_df" meeting both criteria
+    """
+
+    total = counts_df[GENDERS].sum(axis = 1)
+    model_df = pd.DataFrame({
+        'gender':counts_df[GENDERS].idxmax(axis = 1),
+        'confidence':counts_df[GENDERS].max(axis = 1)/total,
+        'total':total})
+
+    return model_df[(model_df.total >= min_count) & (model_df.confidence >= threshold)]
+
+
+def build_first_name_model(
+        labelled_df:pd.DataFrame,
+        threshold:float = DEFAULT_THRESHOLD,
+        min_count:int = DEFAULT_MIN_COUNT,
+        reference_path:str = None):
+    """Returns the model: a DataFrame indexed by first name (gender, confidence, total) of the confident first names
+    """
+
+    model_df = _confident_genders(first_name_counts(labelled_df,reference_path),threshold,min_count)
+    print(f'Gender model: {len(model_df)} confident first names (threshold {threshold}, min count {min_count})')
+
+    return model_df
+
+
+def resolve_genders(names_list:list,model_df:pd.DataFrame):
+    """Returns (resolved_df, unresolved_names): genders of the names whose first name is in the model and the
+    names left to the API
+    """
+
+    names = pd.Series(names_list,dtype = object)
+    genders = _first_names(names).map(model_df.gender)
+    resolved = genders.notna()
+    resolved_df = pd.DataFrame({'cast_member':names[resolved],'gender':genders[resolved]}).reset_index(drop = True)
+    print(f'Gender model: {resolved.sum()} of {len(names)} names resolved offline, {(~resolved).sum()} left to the API')
+
+    return resolved_df, names[~resolved].tolist()
+
+
+def evaluate_model(
+        labelled_df:pd.DataFrame,
+        thresholds:list = [DEFAULT_THRESHOLD],
+        min_count:int = DEFAULT_MIN_COUNT,
+        reference_path:str = None):
+    """Returns a DataFrame with, for each threshold, the coverage (share of labelled names resolved by the model)
+    and the accuracy on the names resolved
+    * Leave-one-out: the label of each name is removed from the counts of its first name before resolving it
+    """
+
+    labelled_df = labelled_df[labelled_df.gender.isin(GENDERS)].reset_index(drop = True)
+    counts_df = first_name_counts(labelled_df,reference_path)
+    first_names = _first_names(labelled_df.cast_member)
+    # Counts of each name's first name, without the name itself
+    loo_counts_df = counts_df.reindex(first_names).reset_index(drop = True)
+    for gender in GENDERS:
+        loo_counts_df[gender] -= (labelled_df.gender == gender).astype('int64')
+
+    results = []
+    for threshold in thresholds:
+        confident_df = _confident_genders(loo_counts_df,threshold,min_count)
+        correct = confident_df.gender == labelled_df.gender[confident_df.index]
+        results.append({
+            'threshold':threshold,
+            'labelled_names':len(labelled_df),
+            'resolved_names':len(confident_df),
+            'coverage':len(confident_df)/len(labelled_df) if len(labelled_df) != 0 else float('nan'),
+            'accuracy':correct.mean() if len(confident_df) != 0 else float('nan')})
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--thresholds',type = float,nargs = '+',default = [0.8,0.9,DEFAULT_THRESHOLD,0.99])
+    parser.add_argument('--min-count',type = int,default = DEFAULT_MIN_COUNT)
+    parser.add_argument('--reference-path',default = None,help = 'csv of first-name counts (first_name, female, male)')
+    parser.add_argument('--cache-path',default = gender_cache.DEFAULT_CACHE_PATH,help = 'gender cache of the API labels')
+    args = parser.parse_args()
+
+    labelled_df = read_labelled_names(args.cache_path)
+    report_df = evaluate_model(labelled_df,args.thresholds,args.min_count,args.reference_path)
+    print(report_df.to_string(index = False))
@@ -0,0 +1,165 @@
+"""Background gender worker: backfills the genders loaded as 'pending' by etl_pipeline(defer_gender = True)
+
+* The ETL queues the pending names in the gender_queue table, in the transaction that loads their cast_members rows
+* A worker claims batches of queued names with a lease (FOR UPDATE SKIP LOCKED: concurrent workers never claim the
+  same names) and resolves them with async_gender_request() (gender cache, canonical keys, checkpoints) outside
+  any transaction. It then backfills cast_members and people with one UPDATE each per batch and removes the names
+  from the queue, in one transaction (no summary table depends on the genders: person_costars is keyed by person)
+* Names whose request failed stay queued and are claimed again when their lease expires; after "max_attempts"
+  claims they get gender 'request_failed'
+* The names of a worker that died are claimed again when their lease expires
+Run from the repository root, one process per worker (add workers to go faster, within the API quota):
+    python gender_worker.py                   # runs until stopped, polling the queue when it is empty
+    python gender_worker.py --once            # drains the queue and exits
+"""
+
+import argparse
+import time
+import pandas as pd
+from sqlalchemy import text
+import gender_cache
+import gender_lookup
+import update_data
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_LEASE_S = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def _queue_query(file:str,queries_path:str):
+    """Returns the query "file" of the gender queue, ready to be executed with bind parameters
+    """
+
+    return text(update_data.read_query(queries_path + '/' + file))
+
+
+def claim_names(
+        batch_size:int = DEFAULT_BATCH_SIZE,
+        lease_s:float = DEFAULT_LEASE_S,
+        queries_path:str = update_data.GENDER_QUEUE_QUERIES_PATH):
+    """Returns a DataFrame (cast_member, enqueued_at, attempts) with up to "batch_size" names claimed for "lease_s"
+    seconds (committed at once: no lock is held during the API requests)
+    """
+
+    with update_data.get_engine().begin() as conn:
+        rows = conn.execute(
+            _queue_query('02_claim_names.sql',queries_path),
+            {'batch_size':batch_size,'lease_s':lease_s}).fetchall()
+
+    return pd.DataFrame(rows,columns = ['cast_member','enqueued_at','attempts'])
+
+
+def backfill_genders(
+        claimed_df:pd.DataFrame,
+        gender_df:pd.DataFrame,
+        max_attempts:int = DEFAULT_MAX_ATTEMPTS,
+        queries_path:str = update_data.GENDER_QUEUE_QUERIES_PATH):
+    """Set the genders of the claimed names (cast_members and people) and remove them from the queue, in one transaction
+    * Returns the number of names backfilled
+    * Names without a gender in "gender_df" (or "request_failed") stay queued, unless this was their last attempt
+    """
+
+    done_df = claimed_df.merge(gender_df,on = 'cast_member',how = 'left')
+    done_df['gender'] = done_df.gender.fillna('request_failed')
+    done_df = done_df[(done_df.gender != 'request_failed') | (done_df.attempts >= max_attempts)]
+    if len(done_df) == 0:
+        return 0
+    names = done_df.cast_member.tolist()
+
+    with update_data.get_engine().begin() as conn:
+        # First statement, as in the ETL load transactions: no deadlock
+        update_data.lock_load_writes(conn)
+        rows_qty = conn.execute(
+            _queue_query('04_backfill_genders.sql',queries_path),
+            {'names':names,'genders':done_df.gender.tolist()}).rowcount
+        conn.execute(
+            _queue_query('07_backfill_people_genders.sql',queries_path),
+            {'names':names,'genders':done_df.gender.tolist()})
+        conn.execute(
+            _queue_query('05_delete_names.sql',queries_path),
+            {'names':names,'enqueued_at':[ts.to_pydatetime() for ts in done_df.enqueued_at]})
+    print(f'Gender worker: {len(names)} names backfilled ({rows_qty} cast_members rows)')
+
+    return len(names)
+
+
+def process_batch(
+        batch_size:int = DEFAULT_BATCH_SIZE,
+        lease_s:float = DEFAULT_LEASE_S,
+        max_attempts:int = DEFAULT_MAX_ATTEMPTS,
+        **request_kwargs):
+    """Claim, resolve and backfill one batch of queued names
+    * Returns the number of names claimed (0 when the queue has nothing to claim)
+    * request_kwargs are passed to update_data.async_gender_request() (api_url, concurrency, rate_limit, use_cache...)
+    """
+
+    claimed_df = claim_names(batch_size,lease_s)
+    if len(claimed_df) == 0:
+        return 0
+    gender_df = update_data.async_gender_request(claimed_df[['cast_member']],**request_kwargs)
+    backfill_genders(claimed_df,gender_df,max_attempts)
+
+    return len(claimed_df)
+
+
+def queue_stats(queries_path:str = update_data.GENDER_QUEUE_QUERIES_PATH):
+    """Returns a dict with the number of names queued and leased
+    """
+
+    with update_data.get_engine().connect() as conn:
+        return dict(conn.execute(_queue_query('06_select_queue_stats.sql',queries_path)).mappings().one())
+
+
+def run_worker(
+        batch_size:int = DEFAULT_BATCH_SIZE,
+        lease_s:float = DEFAULT_LEASE_S,
+        max_attempts:int = DEFAULT_MAX_ATTEMPTS,
+        poll_s:float = 10,
+        once:bool = False,
+        **request_kwargs):
+    """Process batches until the queue has nothing to claim, then exit (once == True) or poll it every "poll_s" seconds
+    * Returns the number of names claimed
+    """
+
+    update_data.execute_ddl_statements()
+    claimed_qty = 0
+    while True:
+        batch_qty = process_batch(batch_size,lease_s,max_attempts,**request_kwargs)
+        claimed_qty += batch_qty
+        if batch_qty == 0:
+            if once == True:
+                break
+            time.sleep(poll_s)
+    stats = queue_stats()
+    print(f"Gender worker: {claimed_qty} names claimed - queue: {stats['queued_qty']} names "
+          f"({stats['leased_qty']} leased by other workers or waiting for a retry)")
+
+    return claimed_qty
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__,formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size',type = int,default = DEFAULT_BATCH_SIZE,help = 'names claimed per batch')
+    parser.add_argument('--lease-s',type = float,default = DEFAULT_LEASE_S,help = 'seconds before a claim expires')
+    parser.add_argument('--max-attempts',type = int,default = DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument('--poll-s',type = float,default = 10,help = 'seconds between polls of an empty queue')
+    parser.add_argument('--once',action = 'store_true',help = 'exit when the queue has nothing to claim')
+    parser.add_argument('--concurrency',type = int,default = 100)
+    parser.add_argument('--rate-limit',type = float,default = 100,help = 'requests per second of this worker')
+    parser.add_argument('--api-url',default = gender_lookup.GENDER_API_URL)
+    parser.add_argument('--cache-path',default = gender_cache.DEFAULT_CACHE_PATH)
+    args = parser.parse_args()
+    # Checked before any name is claimed (gender_lookup.TokenBucket would only fail once a batch is leased)
+    if not args.rate_limit > 0:
+        parser.error(f'--rate-limit must be > 0, got {args.rate_limit}')
+
+    run_worker(
+        batch_size = args.batch_size,
+        lease_s = args.lease_s,
+        max_attempts = args.max_attempts,
+        poll_s = args.poll_s,
+        once = args.once,
+        concurrency = args.concurrency,
+        rate_limit = args.rate_limit,
+        api_url = args.api_url,
+        cache_path = args.cache_path)
@@ -0,0 +1,197 @@
+"""Stage-level timing and metrics of the pipelines (update_data.etl_pipeline() and output_report.reports_pipeline())
+
+* stage() (context manager) and instrumented() (decorator) measure one stage: wall time, CPU time,
+  peak RSS, rows in/out and rows/sec. A line is printed at the end of each stage
+* pipeline_run() collects the stages run inside it and writes a JSON run summary in log/
+  (run_summary_<run name>_<date>.json), optionally with a cProfile dump of each stage
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter, process_time
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+DEFAULT_LOG_DIR = 'log'
+
+_ACTIVE_RUN = None # run dict of pipeline_run(), stages are recorded only inside a run
+_LOCK = threading.Lock()
+_LOCAL = threading.local() # stack of the stages open in each thread
+
+
+def peak_rss_mb():
+    """Returns the peak resident set size of the process so far, in MB (None if unavailable)
+    """
+
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return max_rss/2**20 if sys.platform == 'darwin' else max_rss/2**10 # bytes on macOS, KB on Linux
+
+
+def count_rows(obj):
+    """Returns the number of rows of a stage input or output (None if it is not a collection of rows)
+    * DataFrame, Series and list: length - int: the number itself (e.g. records loaded)
+    * tuple: rows of its first item - dict of DataFrames: total rows
+    """
+
+    if isinstance(obj,(pd.DataFrame,pd.Series,list)):
+        return len(obj)
+    if isinstance(obj,(int,np.integer)) and not isinstance(obj,bool):
+        return int(obj)
+    if isinstance(obj,tuple) and len(obj) != 0:
+        return count_rows(obj[0])
+    if isinstance(obj,dict) and len(obj) != 0 and all(isinstance(v,pd.DataFrame) for v in obj.values()):
+        return sum(len(v) for v in obj.values())
+
+    return None
+
+
+def _format_stage(record:dict):
+    """Returns the one-line description of a stage record
+    """
+
+    line = f"Stage {record['name']}: {record['wall_s']:.3f}s wall - {record['cpu_s']:.3f}s CPU"
+    rows = record['rows_out'] if record['rows_out'] is not None else record['rows_in']
+    if rows is not None:
+        line += f" - {rows} rows ({record['rows_per_s']:.0f} rows/s)"
+    if record['peak_rss_mb'] is not None:
+        line += f" - peak RSS {record['peak_rss_mb']:.0f}MB"
+
+    return line
+
+
+@contextmanager
+def stage(name:str,rows_in:int = None):
+    """Measure the code run inside the "with" block as the stage "name"
+    * Yields the stage record (dict): set record['rows_out'] inside the block to get rows/sec of the output
+    * Inside pipeline_run(profile = True) the outermost stages are also profiled with cProfile
+    """
+
+    record = {'name':name,'rows_in':rows_in,'rows_out':None}
+    if not hasattr(_LOCAL,'stack'):
+        _LOCAL.stack = []
+    stack = _LOCAL.stack
+    record['depth'] = len(stack)
+    run = _ACTIVE_RUN
+    profiler = None
+    if run is not None and run['profile_dir'] is not None and not run['profiling']:
+        # Only one profiler can be active: nested stages are part of the outer stage profile
+        run['profiling'] = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if run is not None:
+        with _LOCK: # recorded in start order, nested stages after their parent
+            record['index'] = len(run['stages'])
+            run['stages'].append(record)
+    stack.append(name)
+    t_start, cpu_start = perf_counter(), process_time()
+    try:
+        yield record
+        record['status'] = 'succeeded'
+    except BaseException:
+        record['status'] = 'failed'
+        raise
+    finally:
+        record['wall_s'] = perf_counter() - t_start
+        record['cpu_s'] = process_time() - cpu_start # whole process, threads started by the stage included
+        stack.pop()
+        record['peak_rss_mb'] = peak_rss_mb()
+        rows = record['rows_out'] if record['rows_out'] is not None else record['rows_in']
+        record['rows_per_s'] = rows/record['wall_s'] if rows is not None and record['wall_s'] > 0 else None
+        if profiler is not None:
+            profiler.disable()
+            run['profiling'] = False
+            record['profile'] = os.path.join(run['profile_dir'],f"{record['index']:02d}_{name}.prof")
+            profiler.dump_stats(record['profile'])
+        print(_format_stage(record))
+
+
+def instrumented(name:str = None,rows_in = None,rows_out = count_rows):
+    """Decorator running each call of the function as a stage (see stage())
+    * name: stage name, the function name by default
+    * rows_in: function of the call arguments returning the input rows, by default count_rows() of the first argument
+    * rows_out: function of the returned value returning the output rows
+    """
+
+    def decorator(function):
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args,**kwargs):
+            if rows_in is not None:
+                input_rows = rows_in(*args,**kwargs)
+            else:
+                input_rows = count_rows(args[0]) if len(args) != 0 else None
+            with stage(stage_name,rows_in = input_rows) as record:
+                result = function(*args,**kwargs)
+                record['rows_out'] = rows_out(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def instrumented_iterator(name:str,iterable):
+    """Yields the items of "iterable", producing each item (e.g. reading a chunk) as a stage
+    """
+
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record['rows_out'] = 0
+                return
+            record['rows_out'] = count_rows(item)
+        yield item
+
+
+@contextmanager
+def pipeline_run(run_name:str,log_dir:str = DEFAULT_LOG_DIR,profile:bool = False):
+    """Record the stages run inside the "with" block and write a JSON run summary in "log_dir"
+    * If profile == True a cProfile dump (.prof) of each outermost stage is written in log_dir/profile/<run>/
+    * The summary is written even if the run fails (status 'failed')
+    """
+
+    global _ACTIVE_RUN
+    started_at = datetime.today()
+    run_id = f"{run_name}_{started_at.strftime(r'%Y-%m-%d %H.%M.%S')}"
+    profile_dir = os.path.join(log_dir,'profile',run_id) if profile else None
+    if profile_dir is not None:
+        os.makedirs(profile_dir,exist_ok = True)
+    run = {'run':run_name,'started_at':started_at.isoformat(),'profile_dir':profile_dir,'profiling':False,'stages':[]}
+    previous_run, _ACTIVE_RUN = _ACTIVE_RUN, run
+    t_start, cpu_start = perf_counter(), process_time()
+    try:
+        yield run
+        run['status'] = 'succeeded'
+    except BaseException:
+        run['status'] = 'failed'
+        raise
+    finally:
+        _ACTIVE_RUN = previous_run
+        run.update({
+            'wall_s':perf_counter() - t_start,
+            'cpu_s':process_time() - cpu_start,
+            'peak_rss_mb':peak_rss_mb()})
+        del run['profiling']
+        summary_path = os.path.join(log_dir,f'run_summary_{run_id}.json')
+        with open(summary_path,'w',encoding = 'utf-8') as f:
+            json.dump(run,f,indent = 2)
+        print(f"Run {run_name} {run['status']} in {run['wall_s']:.3f}s "
+              f"({len(run['stages'])} stages) - summary saved to {summary_path}")
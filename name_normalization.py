@@ -0,0 +1,99 @@
+"""Canonical name keys, used by the gender lookups in update_data.py to request each name only once
+
+Spellings of the same name get the same key: whitespace, case, accents ("João" / "Joao"), punctuation
+("Ahmed el-Sakka" / "Ahmed El Sakka") and name order ("Bae Doona" / "Doona Bae") are ignored.
+build_name_index() maps every raw spelling to its key and to one lookup name per key: only lookup names are
+requested (or read from the gender cache) and fan_out_genders() gives their gender to every spelling.
+"""
+
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+import instrumentation
+
+
+def name_tokens(name:str):
+    """Returns the normalized tokens of a name, in order: accents removed, casefolded, punctuation dropped
+    """
+
+    name = unicodedata.normalize('NFKD',name)
+    name = ''.join(char for char in name if not unicodedata.combining(char)).casefold()
+    name = re.sub(r"[.'’]",'',name) # "J.R." / "JR", "O'Connor" / "OConnor"
+
+    return re.sub(r'[\W_]+',' ',name).split() # hyphens and other separators split tokens
+
+
+def canonical_name_key(name:str):
+    """Returns the canonical key of a name: its normalized tokens (name_tokens()) sorted
+    """
+
+    return ' '.join(sorted(name_tokens(name)))
+
+
+def first_name_key(name:str):
+    """Returns the normalized first name of a name (first token of name_tokens(), '' if there is none)
+    """
+
+    tokens = name_tokens(name)
+
+    return tokens[0] if len(tokens) != 0 else ''
+
+
+# Names whose keys are computed at once by _canonical_keys(): bounds the Python strings alive at the same time
+KEY_CHUNK_SIZE = 100_000
+
+
+def _canonical_keys(names:pd.Series):
+    """Returns canonical_name_key() of each name, with the dtype of "names" (Arrow strings stay Arrow strings)
+    """
+
+    chunks = []
+    for i in range(0,len(names),KEY_CHUNK_SIZE):
+        chunk_names = names.iloc[i:i + KEY_CHUNK_SIZE].to_numpy() # one bulk conversion, not one per element
+        chunks.append(pd.Series([canonical_name_key(name) for name in chunk_names],dtype = names.dtype))
+
+    return pd.concat(chunks,ignore_index = True) if len(chunks) != 0 else pd.Series([],dtype = names.dtype)
+
+
+@instrumentation.instrumented()
+def build_name_index(cast_members:pd.Series):
+    """Returns a DataFrame with one row per distinct raw name of "cast_members" (NaN skipped):
+    cast_member, name_key and lookup_name (most frequent spelling of the key, first seen on ties)
+    * Columns keep the dtype of "cast_members": with Arrow strings (update_data.INPUT_DTYPES) no Python object is
+      kept per name, the lookup names are taken by position
+    """
+
+    # ExtensionArray.factorize() keeps Arrow uniques (an Index would hold Python strings), order of first appearance
+    name_codes, names = cast_members.dropna().array.factorize()
+    names = pd.Series(names)
+    name_qty = np.bincount(name_codes,minlength = len(names))
+    name_keys = _canonical_keys(names)
+    key_codes, _ = name_keys.array.factorize()
+    # Sorted by key, then by descending name_qty (first seen on ties): the first name of each key is its lookup name
+    order = np.lexsort((-name_qty,key_codes))
+    sorted_codes = key_codes[order]
+    lookup_positions = order[np.diff(sorted_codes,prepend = -1) != 0] # indexed by key code
+
+    return pd.DataFrame({
+        'cast_member':names,
+        'name_key':name_keys,
+        'lookup_name':names.array.take(lookup_positions[key_codes])})
+
+
+def fan_out_genders(name_index:pd.DataFrame,gender_df:pd.DataFrame):
+    """Returns a DataFrame (cast_member, gender) giving the gender of each lookup name in "gender_df" to all its spellings
+    """
+
+    lookup_genders = gender_df.rename(columns = {'cast_member':'lookup_name'})
+
+    return name_index[['cast_member','lookup_name']].merge(lookup_genders,on = 'lookup_name')[['cast_member','gender']]
+
+
+def print_dedup_stats(name_index:pd.DataFrame):
+    """Print how many gender requests the canonical keys save
+    """
+
+    lookups_qty = name_index.lookup_name.nunique()
+    print(f'Name normalization: {len(name_index)} distinct names -> {lookups_qty} canonical keys '
+          f'({len(name_index) - lookups_qty} gender lookups saved)')
@@ -1,43 +1,99 @@
-from update_data import create_connection
+from update_data import create_connection, read_query
+import data_quality
+import instrumentation
+import snapshot
 import pandas as pd
 from datetime import datetime
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
+import argparse
 
-def query_to_df(query_path:str):
-    """Returns a DataFrame from the query result
+# {table_name: query}, one single-pass query per table for both null values and invalid data reports
+DATA_QUALITY_QUERIES = data_quality.build_quality_queries()
+ANALYSIS_QUERIES = [
+    'sql_queries/analysis_queries/01_most_common_first_name.sql',
+    'sql_queries/analysis_queries/02_movie_with_longest_timespan.sql',
+    'sql_queries/analysis_queries/03_month_most_new_releases.sql',
+    'sql_queries/analysis_queries/04_tv_shows_largest_increase_year_on_year.sql',
+    'sql_queries/analysis_queries/05_actresses_more_than_one_movie_with_wood.sql']
+
+
+def sql_to_df(query:str):
+    """Returns a DataFrame from the result of the SQL "query"
     """
 
     conn = create_connection()
-    with open(query_path, 'r') as sql_file:
-            query = sql_file.read()
-            df = pd.read_sql_query(query, conn)  
+    df = pd.read_sql_query(query, conn)
     conn.close()
-    
+
     return df
 
 
-def create_null_values_report():
+def query_to_df(query_path:str):
+    """Returns a DataFrame from the query result
+    """
+
+    return sql_to_df(read_query(query_path))
+
+
+def _timed_sql_to_df(query:str):
+    """Returns (DataFrame, elapsed seconds) of sql_to_df()
+    """
+
+    t_start = perf_counter()
+    df = sql_to_df(query)
+    t_end = perf_counter()
+
+    return df, t_end - t_start
+
+
+@instrumentation.instrumented(rows_in = lambda *args,**kwargs: None)
+def run_queries(queries,max_workers:int = 5):
+    """Runs the queries concurrently (each on its own pooled connection) and returns a dict {query_name: DataFrame}
+    * queries is a list of query paths (query_name is the path) or a dict {query_name: query}
+    * max_workers should not exceed the pool size (see update_data.get_engine())
+    * Per-query times (slowest first) and total wall-clock time are printed
+    """
+
+    if not isinstance(queries,dict):
+        queries = {query_path:read_query(query_path) for query_path in queries}
+
+    t_start = perf_counter()
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        futures = {query_name:executor.submit(_timed_sql_to_df,query) for query_name,query in queries.items()}
+        results = {query_name:future.result() for query_name,future in futures.items()}
+    t_end = perf_counter()
+
+    for query_name,(df,elapsed_s) in sorted(results.items(),key = lambda item: item[1][1],reverse = True):
+        print(f'Query {os.path.basename(query_name)} executed in: {elapsed_s:.3f}s')
+    print(f'{len(queries)} queries executed in: {t_end-t_start:.3f}s (wall-clock, {max_workers} workers)')
+
+    return {query_name:df for query_name,(df,elapsed_s) in results.items()}
+
+
+@instrumentation.instrumented()
+def create_null_values_report(query_results:dict = None):
     """Creates a txt file with null values report
     The report contain:
     * Null values quantity for each columns in each table
     * Null values percentage for each columns in each table
+    The checks are the "null_values" rules in data_quality.DATA_QUALITY_RULES
+    If query_results ({table_name: DataFrame}, see run_queries()) is given the queries are not executed again
     """  
     
     today = datetime.today().strftime("%Y-%m-%d %H-%M")
     file_name = 'reports/null_values_report_' + today + '.txt'
     
-    queries_paths = [
-        'sql_queries/validate_output_queries/check_null_table_titles.sql',
-        'sql_queries/validate_output_queries/check_null_table_movies.sql',
-        'sql_queries/validate_output_queries/check_null_table_tv_shows.sql',
-        'sql_queries/validate_output_queries/check_null_table_cast_members.sql']
-    table_names = ['titles','movies','tv_shows','cast_members']
+    if query_results is None:
+        query_results = run_queries(DATA_QUALITY_QUERIES)
  
-    # Loop through four queries and tables to write the full report
+    # Loop through four tables to write the full report
     counter = 0
-    for query_path,table_name in zip(queries_paths,table_names):
-        # Read query into DataFrame
-        null_titles_df = query_to_df(query_path)
+    for table_name in data_quality.QUALITY_TABLES:
+        # Null values columns of the table data-quality query
+        null_titles_df = data_quality.report_metrics(query_results[table_name],table_name,'null_values')
         # Identifies columns with null values
         cols_with_null_values = []
         for col in null_titles_df.columns:
@@ -63,7 +119,8 @@ def create_null_values_report():
         counter+=1
                 
 
-def create_invalid_data_report():
+@instrumentation.instrumented()
+def create_invalid_data_report(query_results:dict = None):
     """Creates a txt file with invalid_data report
     The report contain:
     Table "title":
@@ -83,23 +140,21 @@ def create_invalid_data_report():
         * col "gender" -- % of records == "UNKNOWN"
         * col "gender" -- qty of records == "request_failed"
         * col "gender" -- % of records == "request_failed"
+    The checks are the "invalid_data" rules in data_quality.DATA_QUALITY_RULES
+    If query_results ({table_name: DataFrame}, see run_queries()) is given the queries are not executed again
     """  
     
     today = datetime.today().strftime("%Y-%m-%d %H-%M")
     file_name = 'reports/invalid_data_report_' + today + '.txt'
     
-    queries_paths = [
-        'sql_queries/validate_output_queries/check_invalid_data_table_titles.sql',
-        'sql_queries/validate_output_queries/check_invalid_data_table_movies.sql',
-        'sql_queries/validate_output_queries/check_invalid_data_table_tv_shows.sql',
-        'sql_queries/validate_output_queries/check_invalid_data_table_cast_members.sql']
-    table_names = ['titles','movies','tv_shows','cast_members']
+    if query_results is None:
+        query_results = run_queries(DATA_QUALITY_QUERIES)
     
-    # Loop through four queries and tables to write the full report
+    # Loop through four tables to write the full report
     counter = 0
-    for query_path,table_name in zip(queries_paths,table_names):
-        # Read query into DataFrame
-        invalid_data_df = query_to_df(query_path)
+    for table_name in data_quality.QUALITY_TABLES:
+        # Invalid data columns of the table data-quality query
+        invalid_data_df = data_quality.report_metrics(query_results[table_name],table_name,'invalid_data')
 
         with open(file_name, 'a', encoding='utf-8') as f:
             if counter == 0: # Skip a line from the second iteration
@@ -116,24 +171,26 @@ def create_invalid_data_report():
         counter+=1
                 
 
-def create_analytical_report():
+@instrumentation.instrumented()
+def create_analytical_report(query_results:dict = None):
     """Creates a txt file "analytical_report" with the answers to all the questions in step 5
+    If query_results ({query_path: DataFrame}, see run_queries()) is given the queries are not executed again
     """     
 
     today = datetime.today().strftime("%Y-%m-%d %H-%M")
     file_name = 'reports/analytical_report_' + today + '.txt'
+    if query_results is None:
+        query_results = run_queries(ANALYSIS_QUERIES)
     
     # 1º Query
-    query_1_path = 'sql_queries/analysis_queries/01_most_common_first_name.sql'
-    most_common_first_name_df = query_to_df(query_1_path)
+    most_common_first_name_df = query_results[ANALYSIS_QUERIES[0]]
     # Write results
     with open(file_name, 'w', encoding='utf-8') as f:
         f.write(f'01 - What is the most common first name among actors and actresses?\n')
         f.write(f'{most_common_first_name_df.first_name[0]} - {most_common_first_name_df.first_name_qty[0]} Records')
         
     # 2º Query   
-    query_2_path = 'sql_queries/analysis_queries/02_movie_with_longest_timespan.sql'
-    movie_with_longest_timespan = query_to_df(query_2_path)
+    movie_with_longest_timespan = query_results[ANALYSIS_QUERIES[1]]
     # Checking duplicate values in first position (draw)
     draw_qty = movie_with_longest_timespan.loc[
         movie_with_longest_timespan.year_timespan == max(movie_with_longest_timespan.year_timespan),[
@@ -148,8 +205,7 @@ def create_analytical_report():
                     f'date_added {movie_with_longest_timespan.date_added[i]}\n')
     
     # 3º Query
-    query_3_path = 'sql_queries/analysis_queries/03_month_most_new_releases.sql'
-    month_most_new_releases = query_to_df(query_3_path)
+    month_most_new_releases = query_results[ANALYSIS_QUERIES[2]]
     # Write results
     with open(file_name, 'a', encoding='utf-8') as f:
         f.write(f'\n03 - Which Month of the year had the most new releases historically?\n')
@@ -157,8 +213,7 @@ def create_analytical_report():
                 f'{month_most_new_releases.qty_titles_added[0]} Titles added')
     
     # 4º Query
-    query_4_path = 'sql_queries/analysis_queries/04_tv_shows_largest_increase_year_on_year.sql'
-    tv_shows_largest_increase = query_to_df(query_4_path)
+    tv_shows_largest_increase = query_results[ANALYSIS_QUERIES[3]]
     # Write results
     with open(file_name, 'a', encoding='utf-8') as f:
         f.write(f'\n\n04 - Which year had the largest increase year on year (percentage wise) for TV Shows?\n')
@@ -166,8 +221,7 @@ def create_analytical_report():
                 f'{tv_shows_largest_increase.increase_percent[0]:.2f}% Increase percent.')
 
     # 5º Query
-    query_5_path = 'sql_queries/analysis_queries/05_actresses_more_than_one_movie_with_wood.sql'
-    actresses_with_woody = query_to_df(query_5_path)
+    actresses_with_woody = query_results[ANALYSIS_QUERIES[4]]
     # Write results
     with open(file_name, 'a', encoding='utf-8') as f:
         f.write(f'\n\n05 - List the actresses that have appeared in a movie with Woody Harrelson more than once?\n')
@@ -176,14 +230,35 @@ def create_analytical_report():
                     f'{actresses_with_woody.qty_movies_with_woody[i]:.0f} Movies with Woody Harrelson\n')
 
 
-def reports_pipeline():
+def reports_pipeline(max_workers:int = 5,snapshot_path:str = None,profile:bool = False):
     """Generates three reports on folder Linkfire_data_engineer_task/reports
+    * All queries run concurrently first (run_queries()), then the reports are written in a fixed order
+    * Null values and invalid data reports share one data-quality query per table
+    * If snapshot_path is given the reports are computed offline, from a Parquet snapshot
+      (see snapshot.export_snapshot()), without connecting to the db
+    * Each stage is timed (instrumentation.py): a JSON run summary is saved in log/,
+      with a cProfile dump of each stage if profile == True
     """ 
     
-    create_null_values_report()
-    create_invalid_data_report()
-    create_analytical_report()
+    with instrumentation.pipeline_run('reports_pipeline',profile = profile):
+        if snapshot_path is None:
+            queries = dict(DATA_QUALITY_QUERIES)
+            queries.update({query_path:read_query(query_path) for query_path in ANALYSIS_QUERIES})
+            query_results = run_queries(queries,max_workers = max_workers)
+        else:
+            query_results = snapshot.offline_query_results(ANALYSIS_QUERIES,snapshot_path)
+        create_null_values_report(query_results)
+        create_invalid_data_report(query_results)
+        create_analytical_report(query_results)
 
 
 if __name__ == '__main__':
-    reports_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = 'Generate the null values, invalid data and analytical reports')
+    parser.add_argument(
+        '--snapshot-path',
+        default = None,
+        help = 'offline mode: compute the reports from this Parquet snapshot instead of the db')
+    parser.add_argument('--profile',action = 'store_true',help = 'save a cProfile dump of each stage in log/profile')
+    args = parser.parse_args()
+
+    reports_pipeline(snapshot_path = args.snapshot_path,profile = args.profile)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""Parallel transform of the input titles: movies/tv_shows (update_data.split_titles_by_type()) and cast_members
+(update_data.create_cast_members_df()) computed in a process pool, for inputs of millions of rows
+
+* The input is partitioned by show_id ranges of about the same size, bounded by quantiles of a sample of the
+  show_ids (a show_id repeated in the input stays in one partition)
+* DataFrames are not pickled between processes: the input is written once as an Arrow IPC file that every worker
+  memory-maps and filters to its range, and each worker writes its results as Arrow IPC files that the parent
+  memory-maps and concatenates without copying the strings. Only file paths, bounds and dtypes go through the pool
+* Results have the same records as the serial transforms, grouped by partition (in input order within a partition,
+  the names of a title in cast order): nothing is sorted back in the parent, which would be serial work
+Used by update_data.transform_titles() when workers > 1 (`python update_data.py --workers 4`)
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import update_data
+
+# Input columns used by the transforms
+TRANSFORM_COLS = ['show_id','type','date_added','release_year','duration','cast']
+BOUNDS_SAMPLE_SIZE = 100_000
+
+
+def show_id_bounds(show_ids:pd.Series,partitions_qty:int,sample_size:int = BOUNDS_SAMPLE_SIZE):
+    """Returns the partitions_qty + 1 bounds of the show_id ranges: None, partitions_qty - 1 quantiles of a sample
+    of "show_ids", None (partition i has the show_ids >= bounds[i] and < bounds[i + 1], None: unbounded)
+    """
+
+    show_ids = show_ids.dropna()
+    # Positions drawn with replacement: Series.sample() would shuffle all the positions
+    positions = np.random.default_rng(0).integers(0,len(show_ids),min(sample_size,len(show_ids)))
+    sample = np.sort(show_ids.iloc[positions].to_numpy(str))
+    # Without show_ids every range but the last is empty
+    quantiles = [sample[len(sample)*i//partitions_qty] if len(sample) != 0 else '' for i in range(1,partitions_qty)]
+
+    return [None] + quantiles + [None]
+
+
+def _range_mask(show_ids:pa.ChunkedArray,lower:str,upper:str):
+    """Returns the filter of the show_ids >= lower and < upper (None: unbounded), null show_ids in the first range
+    """
+
+    mask = pa.chunked_array([np.ones(len(show_ids),dtype = bool)])
+    if lower is not None:
+        mask = pc.and_(mask,pc.fill_null(pc.greater_equal(show_ids,lower),False))
+    if upper is not None:
+        mask = pc.and_(mask,pc.fill_null(pc.less(show_ids,upper),lower is None))
+
+    return mask
+
+
+def _write_ipc(df:pd.DataFrame,file_path:str):
+    """Writes "df" (index dropped) as an Arrow IPC file, returns (file_path, dtypes of the columns)
+    """
+
+    table = pa.Table.from_pandas(df,preserve_index = False)
+    with pa.OSFile(file_path,'wb') as sink:
+        with pa.ipc.new_file(sink,table.schema) as writer:
+            writer.write_table(table)
+
+    return file_path, df.dtypes.to_dict()
+
+
+def _read_ipc(file_path:str):
+    """Returns the Arrow table of an IPC file, memory-mapped (its buffers are not copied)
+    """
+
+    with pa.memory_map(file_path,'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _table_to_df(table:pa.Table,dtypes:dict):
+    """Returns "table" as a DataFrame with "dtypes"
+    * Extension dtypes are rebuilt from the Arrow columns (Arrow strings stay Arrow strings, which to_pandas() would
+      convert to Python strings)
+    """
+
+    return pd.DataFrame({
+        col:dtype.__from_arrow__(table[col]) if hasattr(dtype,'__from_arrow__') else table[col].to_pandas()
+        for col,dtype in dtypes.items()})
+
+
+def _transform_partition(input_path:str,input_dtypes:dict,lower:str,upper:str,partition:int,output_dir:str):
+    """Worker: transforms the rows with a show_id in [lower, upper) and writes the results
+    * Movies and tv_shows keep the input row of each record ("_row"), to restore the index of the input
+    * Returns {result name: (file path, dtypes)}
+    """
+
+    table = _read_ipc(input_path)
+    table = table.filter(_range_mask(table['show_id'],lower,upper))
+    partition_df = _table_to_df(table,input_dtypes)
+    partition_df.index = partition_df.pop('_row').to_numpy()
+
+    results = {}
+    for title_type,titles_df in update_data.split_titles_by_type(partition_df).items():
+        results[title_type] = titles_df.assign(_row = titles_df.index)
+    results['cast_members'] = update_data.create_cast_members_df.__wrapped__(partition_df) # not a stage of its own
+
+    return {
+        name:_write_ipc(result_df,os.path.join(output_dir,f'{name.replace(" ","_")}_{partition}.arrow'))
+        for name,result_df in results.items()}
+
+
+def _gather(partition_results:list,name:str):
+    """Returns the results "name" of all the partitions in one DataFrame, in partition order
+    * Empty partitions are skipped unless all are empty: their dtypes could differ (ex: object duration)
+    """
+
+    frames = [_table_to_df(_read_ipc(file_path),dtypes) for file_path,dtypes in (
+        results[name] for results in partition_results)]
+    frames = [df for df in frames if len(df) != 0] or frames[:1]
+
+    # Arrow strings are concatenated as chunks, without copy
+    return pd.concat(frames,ignore_index = True)
+
+
+def transform_partitioned(netflix_df:pd.DataFrame,workers:int = None):
+    """Returns (split_titles_by_type(), create_cast_members_df()) of "netflix_df", computed in a pool of
+    "workers" processes (os.cpu_count() by default), one partition of show_ids per worker
+    """
+
+    workers = workers or os.cpu_count()
+    input_df = netflix_df[TRANSFORM_COLS].reset_index(drop = True)
+    input_df['_row'] = np.arange(len(input_df))
+    bounds = show_id_bounds(input_df['show_id'],workers)
+
+    with tempfile.TemporaryDirectory(prefix = 'parallel_transform_') as tmp_dir:
+        input_path, input_dtypes = _write_ipc(input_df,os.path.join(tmp_dir,'input.arrow'))
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            partition_results = list(executor.map(
+                _transform_partition,
+                [input_path]*workers,[input_dtypes]*workers,bounds[:-1],bounds[1:],range(workers),[tmp_dir]*workers))
+
+        titles_by_type = {}
+        for title_type in update_data.DURATION_COLS:
+            titles_df = _gather(partition_results,title_type)
+            # Index of the input rows, as with the serial transform
+            titles_df.index = netflix_df.index[titles_df.pop('_row').to_numpy()]
+            titles_by_type[title_type] = titles_df
+        cast_members_df = _gather(partition_results,'cast_members')
+
+    return titles_by_type, cast_members_df
@@ -0,0 +1,173 @@
+"""Small DAG executor: stages run in threads and pass items through bounded queues (used by
+update_data.etl_batch_pipelined())
+
+* A stage is a dict: name, function, input (name of the queue it consumes, None for the source stage),
+  outputs (names of the queues it emits to) and workers (threads running the stage, 1 by default)
+* The source stage runs function(emit) once, the other stages run function(item,emit) for each item of their input.
+  emit(queue name,item) sends an item downstream
+* Queues hold at most "queue_size" items: emit() blocks while the queue is full (backpressure), so a fast stage
+  cannot run ahead of a slow one by more than the queue size
+* A queue is closed when all the workers of the stages emitting to it are done, its consumers then stop
+* If a stage raises, the other stages stop at their next get/emit and run_pipeline() raises the error
+* Utilisation readout: for each stage the time its workers spent busy, starved (waiting for an input item) and
+  blocked (waiting for room downstream), as shares of workers * wall time
+"""
+
+import queue
+import threading
+from time import perf_counter
+import pandas as pd
+
+_END = object() # end of a queue, one per consumer worker
+POLL_S = 0.1 # how often blocked gets/puts check that the pipeline was not stopped
+
+
+class PipelineStopped(Exception):
+    """Raised in a stage worker when another stage failed
+    """
+
+
+def _put(item_queue:queue.Queue,item,stop:threading.Event):
+    """Put "item" in "item_queue", waiting for room unless the pipeline is stopped
+    """
+
+    while True:
+        if stop.is_set():
+            raise PipelineStopped()
+        try:
+            item_queue.put(item,timeout = POLL_S)
+            return
+        except queue.Full:
+            pass
+
+
+def _get(item_queue:queue.Queue,stop:threading.Event):
+    """Returns the next item of "item_queue", waiting for one unless the pipeline is stopped
+    """
+
+    while True:
+        if stop.is_set():
+            raise PipelineStopped()
+        try:
+            return item_queue.get(timeout = POLL_S)
+        except queue.Empty:
+            pass
+
+
+def _check_stages(stages:list):
+    """Raises ValueError if the stages do not form a DAG with one source and one consumer stage per queue
+    """
+
+    sources = [stage['name'] for stage in stages if stage.get('input') is None]
+    if len(sources) != 1:
+        raise ValueError(f'A pipeline needs exactly one source stage (input None), got {sources}')
+    consumers = {}
+    for stage in stages:
+        if stage.get('input') is not None:
+            if stage['input'] in consumers:
+                raise ValueError(f"Queue {stage['input']!r} is consumed by {consumers[stage['input']]} and {stage['name']}")
+            consumers[stage['input']] = stage['name']
+    for stage in stages:
+        for output in stage.get('outputs',[]):
+            if output not in consumers:
+                raise ValueError(f"Stage {stage['name']!r} emits to {output!r}, which no stage consumes")
+
+
+def run_pipeline(stages:list,queue_size:int = 4):
+    """Run "stages" (see the module docstring) until the source is done and every queue is drained
+    * Returns a DataFrame with one row per stage: workers, items_qty, busy_s, starved_s, blocked_s and their shares
+      (utilisation = busy share), plus the peak size of its input queue
+    """
+
+    _check_stages(stages)
+    queues = {stage['input']:queue.Queue(maxsize = queue_size) for stage in stages if stage.get('input') is not None}
+    consumer_workers = {stage['input']:stage.get('workers',1) for stage in stages if stage.get('input') is not None}
+    producer_workers = {name:0 for name in queues}
+    for stage in stages:
+        for output in stage.get('outputs',[]):
+            producer_workers[output] += stage.get('workers',1)
+    peak_sizes = {name:0 for name in queues}
+    lock = threading.Lock()
+    stop = threading.Event()
+    errors = []
+    worker_stats = []
+
+    def emit(stats:dict,queue_name:str,item):
+        t_start = perf_counter()
+        _put(queues[queue_name],item,stop)
+        stats['blocked_s'] += perf_counter() - t_start
+        with lock:
+            peak_sizes[queue_name] = max(peak_sizes[queue_name],queues[queue_name].qsize())
+
+    def run_worker(stage:dict,stats:dict):
+        stage_emit = lambda queue_name,item: emit(stats,queue_name,item)
+        try:
+            if stage.get('input') is None:
+                t_start = perf_counter()
+                stage['function'](stage_emit)
+                stats['busy_s'] += perf_counter() - t_start - stats['blocked_s']
+                stats['items_qty'] += 1
+            else:
+                while True:
+                    t_start = perf_counter()
+                    item = _get(queues[stage['input']],stop)
+                    stats['starved_s'] += perf_counter() - t_start
+                    if item is _END:
+                        break
+                    t_start, blocked_start = perf_counter(), stats['blocked_s']
+                    stage['function'](item,stage_emit)
+                    stats['busy_s'] += perf_counter() - t_start - (stats['blocked_s'] - blocked_start)
+                    stats['items_qty'] += 1
+            # Last producer worker of a queue: its consumers can stop once they have drained it
+            for output in stage.get('outputs',[]):
+                with lock:
+                    producer_workers[output] -= 1
+                    closed = producer_workers[output] == 0
+                if closed:
+                    for _ in range(consumer_workers[output]):
+                        _put(queues[output],_END,stop)
+        except PipelineStopped:
+            pass
+        except BaseException as error:
+            with lock:
+                errors.append(error)
+            stop.set()
+
+    threads = []
+    t_start = perf_counter()
+    for stage in stages:
+        for worker in range(stage.get('workers',1)):
+            stats = {'stage':stage['name'],'items_qty':0,'busy_s':0.0,'starved_s':0.0,'blocked_s':0.0}
+            worker_stats.append(stats)
+            threads.append(threading.Thread(
+                target = run_worker,args = (stage,stats),name = f"{stage['name']}_{worker}",daemon = True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = perf_counter() - t_start
+    if len(errors) != 0:
+        raise errors[0]
+
+    stats_df = pd.DataFrame(worker_stats).groupby('stage',sort = False).agg(
+        workers = ('items_qty','size'),items_qty = ('items_qty','sum'),busy_s = ('busy_s','sum'),
+        starved_s = ('starved_s','sum'),blocked_s = ('blocked_s','sum'))
+    for col in ['busy','starved','blocked']:
+        stats_df[col + '_share'] = stats_df[col + '_s']/(stats_df.workers*wall_s) if wall_s > 0 else 0.0
+    stats_df = stats_df.rename(columns = {'busy_share':'utilisation'})
+    stats_df['peak_input_queue'] = [peak_sizes.get(stage.get('input'),None) for stage in stages]
+    stats_df['wall_s'] = wall_s
+
+    return stats_df.reset_index()
+
+
+def print_utilisation(stats_df:pd.DataFrame):
+    """Print one line per stage of run_pipeline(): items, utilisation, starved and blocked shares
+    """
+
+    for row in stats_df.itertuples():
+        line = (f'Pipeline stage {row.stage}: {row.items_qty} items - {row.workers} worker(s) - '
+                f'utilisation {row.utilisation:.0%} - starved {row.starved_share:.0%} - blocked {row.blocked_share:.0%}')
+        if not pd.isna(row.peak_input_queue):
+            line += f' - peak input queue {row.peak_input_queue:.0f}'
+        print(line)
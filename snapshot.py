@@ -0,0 +1,199 @@
+"""Columnar (Parquet) snapshot of the database and offline answers to the report queries
+
+* export_snapshot() writes titles, movies, tv_shows, cast_members, people and person_costars as Parquet datasets
+  (one folder per table), hive-partitioned by the columns in PARTITION_COLS
+* offline_query_results() computes, from a snapshot and with vectorized pandas, the same results as the
+  data-quality and analysis queries of output_report.py, so the reports can be written without a database
+"""
+
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import data_quality
+import instrumentation
+
+DEFAULT_SNAPSHOT_PATH = 'snapshot'
+# titles are split by type and cast_members by gender, the filters of the analysis questions
+PARTITION_COLS = {
+    'titles':['type'],
+    'movies':[],
+    'tv_shows':[],
+    'cast_members':['gender'],
+    'people':[],
+    'person_costars':[]}
+SCHEMA_FILE = '_common_metadata' # full schema (partition columns included), ignored when reading the data files
+
+
+@instrumentation.instrumented(rows_out = lambda rows_qty: sum(rows_qty.values()))
+def export_snapshot(conn,snapshot_path:str = DEFAULT_SNAPSHOT_PATH):
+    """Write the tables of PARTITION_COLS of the db ("conn") as Parquet datasets in "snapshot_path" and returns {table_name: rows}
+    * The snapshot is written in a temporary folder and replaces the previous one only once complete
+    """
+
+    tmp_path = snapshot_path + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    rows_qty = {}
+    for table_name,partition_cols in PARTITION_COLS.items():
+        table = pa.Table.from_pandas(pd.read_sql_query(f'SELECT * FROM {table_name}',conn),preserve_index = False)
+        table_path = os.path.join(tmp_path,table_name)
+        pq.write_to_dataset(table,table_path,partition_cols = partition_cols or None)
+        pq.write_metadata(table.schema,os.path.join(table_path,SCHEMA_FILE))
+        rows_qty[table_name] = table.num_rows
+    if os.path.exists(snapshot_path):
+        shutil.rmtree(snapshot_path)
+    os.replace(tmp_path,snapshot_path)
+    print(f'Snapshot exported to {snapshot_path}: {rows_qty}')
+
+    return rows_qty
+
+
+def read_snapshot_table(table_name:str,snapshot_path:str = DEFAULT_SNAPSHOT_PATH,columns:list = None,filter = None):
+    """Returns a table of the snapshot as a DataFrame, with the same columns and dtypes as when exported
+    * filter is a pyarrow.dataset expression, e.g. ds.field('gender') == 'female' (only matching partitions are read)
+    """
+
+    table_path = os.path.join(snapshot_path,table_name)
+    dataset = ds.dataset(
+        table_path,
+        schema = pq.read_schema(os.path.join(table_path,SCHEMA_FILE)),
+        format = 'parquet',
+        partitioning = 'hive')
+
+    return dataset.to_table(columns = columns,filter = filter).to_pandas()
+
+
+def offline_quality_results(tables:dict):
+    """Returns {table_name: DataFrame} with the same one-row result as data_quality.build_quality_query() for each table
+    * tables is {table_name: DataFrame}
+    """
+
+    return {
+        table_name:pd.DataFrame({
+            rule.metric:[rule.evaluate(tables[table_name])]
+            for rule in data_quality.DATA_QUALITY_RULES if rule.table == table_name})
+        for table_name in data_quality.QUALITY_TABLES}
+
+
+def _sort_desc(df:pd.DataFrame,value_col:str,key_col:str):
+    """Returns "df" sorted by "value_col" descending, ties by "key_col" (same order as the analysis queries)
+    """
+
+    return df.sort_values([value_col,key_col],ascending = [False,True]).reset_index(drop = True)
+
+
+def _first_names(cast_members:pd.Series):
+    """Returns the first name of each cast member (text before the first space, the full name if there is none)
+    """
+
+    first_names = cast_members.str.partition(' ')[0]
+
+    return first_names.where(first_names != '',cast_members)
+
+
+def most_common_first_name(cast_members_df:pd.DataFrame):
+    """Offline version of analysis query 01
+    * Counts the first names parsed by the ETL (cast_members.first_name), parsed here in older snapshots
+    """
+
+    if 'first_name' in cast_members_df.columns:
+        counts = cast_members_df.first_name.dropna().value_counts()
+    else:
+        counts = _first_names(cast_members_df.cast_member.dropna()).value_counts()
+    df = pd.DataFrame({'first_name':counts.index.astype(object),'first_name_qty':counts.values.astype('int64')})
+
+    return _sort_desc(df,'first_name_qty','first_name')
+
+
+def movie_with_longest_timespan(movies_df:pd.DataFrame,titles_df:pd.DataFrame):
+    """Offline version of analysis query 02
+    """
+
+    df = movies_df.merge(titles_df[['show_id','title']],how = 'left',on = 'show_id')
+    date_added = df.date_added.dt
+    df = pd.DataFrame({
+        'show_id':df.show_id,
+        'title':df.title,
+        'date_added':df.date_added,
+        'release_year':df.release_year,
+        # date_part() returns double precision
+        'year_added':date_added.year.astype('float64'),
+        'month_added':date_added.month.astype('float64'),
+        'day_added':date_added.day.astype('float64'),
+        'year_timespan':date_added.year.astype('float64') - df.release_year})
+    # Postgres sorts NULL first in descending order
+    df = df.assign(null_timespan = df.year_timespan.isna()).sort_values(
+        ['null_timespan','year_timespan','month_added','day_added','show_id'],
+        ascending = [False,False,True,True,True])
+
+    return df.drop(columns = 'null_timespan').reset_index(drop = True)
+
+
+def month_most_new_releases(movies_df:pd.DataFrame,tv_shows_df:pd.DataFrame):
+    """Offline version of analysis query 03
+    """
+
+    date_added = pd.concat([movies_df.date_added,tv_shows_df.date_added],ignore_index = True).dropna()
+    counts = date_added.dt.month.astype('float64').value_counts()
+    df = pd.DataFrame({'month_added':counts.index,'qty_titles_added':counts.values.astype('int64')})
+
+    return _sort_desc(df,'qty_titles_added','month_added')
+
+
+def tv_shows_largest_increase(tv_shows_df:pd.DataFrame):
+    """Offline version of analysis query 04
+    """
+
+    date_added = tv_shows_df.date_added[tv_shows_df.date_added > '2009-01-01']
+    qty_added_year = date_added.dt.year.astype('float64').value_counts().sort_index()
+    cumulative_total = qty_added_year.cumsum()
+    df = pd.DataFrame({
+        'year_added':qty_added_year.index,
+        'qty_added_year':qty_added_year.values.astype('int64'),
+        'cumulative_total':cumulative_total.values,
+        'increase_percent':100*qty_added_year.values/cumulative_total.values})
+
+    return _sort_desc(df[df.year_added != 2013],'increase_percent','year_added')
+
+
+def actresses_with_woody(
+        people_df:pd.DataFrame,
+        person_costars_df:pd.DataFrame,
+        cast_member:str = 'Woody Harrelson'):
+    """Offline version of analysis query 05
+    * Same tables as the query: co-appearances counted once per title (person_costars), gender of the co-star
+      stored once per person (people)
+    """
+
+    person_ids = people_df.person_id[people_df.person_name == cast_member]
+    pairs_df = person_costars_df[person_costars_df.person_id.isin(person_ids) & (person_costars_df.shows_qty > 1)]
+    costars_df = pairs_df.merge(
+        people_df[['person_id','person_name','gender']],left_on = 'costar_id',right_on = 'person_id')
+    costars_df = costars_df[costars_df.gender == 'female']
+    df = pd.DataFrame({
+        'cast_member':costars_df.person_name.astype(object).to_numpy(),
+        'qty_movies_with_woody':costars_df.shows_qty.astype('int64').to_numpy()})
+
+    return _sort_desc(df,'qty_movies_with_woody','cast_member')
+
+
+@instrumentation.instrumented(rows_in = lambda *args,**kwargs: None)
+def offline_query_results(analysis_queries:list,snapshot_path:str = DEFAULT_SNAPSHOT_PATH):
+    """Returns the results of the data-quality queries ({table_name: DataFrame}) and of the analysis queries
+    ({query_path: DataFrame}, in the order of "analysis_queries", see output_report.ANALYSIS_QUERIES), from a snapshot
+    """
+
+    tables = {table_name:read_snapshot_table(table_name,snapshot_path) for table_name in PARTITION_COLS}
+    query_results = offline_quality_results(tables)
+    analysis_results = [
+        most_common_first_name(tables['cast_members']),
+        movie_with_longest_timespan(tables['movies'],tables['titles']),
+        month_most_new_releases(tables['movies'],tables['tv_shows']),
+        tv_shows_largest_increase(tables['tv_shows']),
+        actresses_with_woody(tables['people'],tables['person_costars'])]
+    query_results.update(zip(analysis_queries,analysis_results))
+
+    return query_results
@@ -0,0 +1,2 @@
+/*Fingerprint of the input row of each title, used by the incremental (change-data) load*/
+ALTER TABLE titles ADD COLUMN IF NOT EXISTS content_hash bigint;
\ No newline at end of file
@@ -0,0 +1,10 @@
+/*Secondary indexes for the access paths of the ETL and of the analysis queries (sql_queries/analysis_queries)
+Checked with: python -m benchmarks.explain_analysis_queries*/
+
+-- show_id foreign keys: join with titles (02), summary tables refresh and per-title deletes of the incremental load
+CREATE INDEX IF NOT EXISTS movies_show_id_idx ON movies (show_id);
+CREATE INDEX IF NOT EXISTS tv_shows_show_id_idx ON tv_shows (show_id);
+CREATE INDEX IF NOT EXISTS cast_members_show_id_idx ON cast_members (show_id);
+
+-- cast_member lookups (known genders of the incremental load), gender included so it is read from the index
+CREATE INDEX IF NOT EXISTS cast_members_cast_member_gender_idx ON cast_members (cast_member, gender);
@@ -0,0 +1,19 @@
+/*Aggregates read by the analysis queries, refreshed incrementally by the ETL (sql_queries/summary_queries)*/
+
+-- Superseded by titles_added_daily (analysis query 04)
+DROP INDEX IF EXISTS tv_shows_year_added_idx;
+
+-- Cast members per first name (analysis query 01)
+CREATE TABLE IF NOT EXISTS first_name_counts (
+	first_name text NOT NULL,
+	first_name_qty bigint NOT NULL,
+	CONSTRAINT first_name_counts_pkey PRIMARY KEY (first_name)
+);
+
+-- Titles added per type and day (analysis queries 03 and 04)
+CREATE TABLE IF NOT EXISTS titles_added_daily (
+	type text NOT NULL,
+	date_added timestamp NOT NULL,
+	titles_qty bigint NOT NULL,
+	CONSTRAINT titles_added_daily_pkey PRIMARY KEY (type, date_added)
+);
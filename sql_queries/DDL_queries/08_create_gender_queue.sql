@@ -0,0 +1,11 @@
+/*Names loaded with gender 'pending' (etl_pipeline(defer_gender = True)), drained by gender_worker.py*/
+CREATE TABLE IF NOT EXISTS gender_queue (
+	cast_member text NOT NULL,
+	enqueued_at timestamptz NOT NULL DEFAULT clock_timestamp(),
+	leased_until timestamptz,
+	attempts integer NOT NULL DEFAULT 0,
+	CONSTRAINT gender_queue_pkey PRIMARY KEY (cast_member)
+);
+
+-- Oldest names are claimed first
+CREATE INDEX IF NOT EXISTS gender_queue_enqueued_at_idx ON gender_queue (enqueued_at);
@@ -0,0 +1,49 @@
+/*People, genres and countries dimensions with integer surrogate keys, and the bridge tables linking them to titles
+Loaded by update_data.update_dimension_tables(): values are factorized in Python, keys are assigned by the db*/
+
+-- One row per cast member name: gender is stored once per person
+CREATE TABLE IF NOT EXISTS people (
+	person_id integer GENERATED ALWAYS AS IDENTITY,
+	person_name text NOT NULL,
+	gender text,
+	CONSTRAINT people_pkey PRIMARY KEY (person_id),
+	CONSTRAINT people_person_name_key UNIQUE (person_name)
+);
+
+-- Values of titles.listed_in
+CREATE TABLE IF NOT EXISTS genres (
+	genre_id smallint GENERATED ALWAYS AS IDENTITY,
+	genre text NOT NULL,
+	CONSTRAINT genres_pkey PRIMARY KEY (genre_id),
+	CONSTRAINT genres_genre_key UNIQUE (genre)
+);
+
+-- Values of titles.country
+CREATE TABLE IF NOT EXISTS countries (
+	country_id smallint GENERATED ALWAYS AS IDENTITY,
+	country text NOT NULL,
+	CONSTRAINT countries_pkey PRIMARY KEY (country_id),
+	CONSTRAINT countries_country_key UNIQUE (country)
+);
+
+-- Bridge tables: one row per title and value (the primary key serves lookups by title, the index by value)
+CREATE TABLE IF NOT EXISTS title_people (
+	show_id text NOT NULL REFERENCES titles,
+	person_id integer NOT NULL REFERENCES people,
+	CONSTRAINT title_people_pkey PRIMARY KEY (show_id, person_id)
+);
+CREATE INDEX IF NOT EXISTS title_people_person_id_idx ON title_people (person_id);
+
+CREATE TABLE IF NOT EXISTS title_genres (
+	show_id text NOT NULL REFERENCES titles,
+	genre_id smallint NOT NULL REFERENCES genres,
+	CONSTRAINT title_genres_pkey PRIMARY KEY (show_id, genre_id)
+);
+CREATE INDEX IF NOT EXISTS title_genres_genre_id_idx ON title_genres (genre_id);
+
+CREATE TABLE IF NOT EXISTS title_countries (
+	show_id text NOT NULL REFERENCES titles,
+	country_id smallint NOT NULL REFERENCES countries,
+	CONSTRAINT title_countries_pkey PRIMARY KEY (show_id, country_id)
+);
+CREATE INDEX IF NOT EXISTS title_countries_country_id_idx ON title_countries (country_id);
@@ -0,0 +1,25 @@
+/*Cast member names parsed once by the ETL (update_data.split_names()) and co-appearances keyed by person,
+read through their indexes by analysis queries 01 and 05*/
+
+-- Filled when the cast members are loaded, older rows by update_data.ensure_summary_tables()
+ALTER TABLE cast_members ADD COLUMN IF NOT EXISTS first_name text;
+ALTER TABLE cast_members ADD COLUMN IF NOT EXISTS last_name text;
+
+-- Report order of analysis query 01
+CREATE INDEX IF NOT EXISTS first_name_counts_qty_idx ON first_name_counts (first_name_qty DESC, first_name);
+
+-- Titles shared by two people (analysis query 05): the primary key serves the lookups by person,
+-- the gender of the co-star is read from people, so a gender backfill leaves the counts unchanged
+CREATE TABLE IF NOT EXISTS person_costars (
+	person_id integer NOT NULL,
+	costar_id integer NOT NULL,
+	shows_qty bigint NOT NULL,
+	CONSTRAINT person_costars_pkey PRIMARY KEY (person_id, costar_id)
+);
+-- Most pairs share one title: the co-stars of a person in more than one title are read from this small index,
+-- in report order, without visiting the other pairs
+CREATE INDEX IF NOT EXISTS person_costars_repeated_idx ON person_costars (person_id, shows_qty DESC) INCLUDE (costar_id)
+	WHERE shows_qty > 1;
+
+-- costar_pairs (keyed by name and co-star gender) is superseded by person_costars (keyed by person_id, costar_id)
+DROP TABLE IF EXISTS costar_pairs;
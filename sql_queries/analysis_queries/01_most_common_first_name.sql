@@ -1,20 +1,9 @@
+/*first_name_counts is refreshed by the ETL (sql_queries/summary_queries/01_refresh_first_name_counts.sql), read in the order of first_name_counts_qty_idx*/
 SELECT 
-	CASE
-	WHEN SUBSTRING(cast_member,0,strpos(cast_member,' ')) = '' -- has only the first name
-	THEN cast_member 
-	ELSE SUBSTRING(cast_member,0,strpos(cast_member,' '))
-	END AS first_name,
-	COUNT(
-		CASE
-		WHEN SUBSTRING(cast_member,0,strpos(cast_member,' ')) = ''
-		THEN cast_member 
-		ELSE SUBSTRING(cast_member,0,strpos(cast_member,' '))
-		END) AS first_name_qty
+	first_name,
+	first_name_qty
 FROM
-	cast_members
-WHERE 
-	cast_member is not null
-GROUP BY 
-	first_name
+	first_name_counts
 ORDER BY
-	first_name_qty DESC
\ No newline at end of file
+	first_name_qty DESC,
+	first_name
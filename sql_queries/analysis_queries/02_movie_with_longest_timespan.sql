@@ -16,4 +16,5 @@ ON
 ORDER BY
 	year_timespan DESC,
 	month_added,
-	day_added
\ No newline at end of file
+	day_added,
+	mv.show_id
@@ -1,25 +1,29 @@
 /*Subquery just to filter the first year  
-which will not have an increase since it is the first*/
+which will not have an increase since it is the first
+titles_added_daily is refreshed by the ETL (sql_queries/summary_queries/02_refresh_titles_added_daily.sql)*/
 WITH increase_table AS (
 	SELECT 
 		date_part('year', date_added) AS year_added,
-		count(date_part('year', date_added)) as qty_added_year,
-		sum(count(date_part('year', date_added))) 
+		CAST(SUM(titles_qty) AS bigint) as qty_added_year,
+		sum(SUM(titles_qty)) 
 			OVER (ORDER BY date_part('year', date_added)) as cumulative_total,
 		cast(100 AS FLOAT)*
-			count(date_part('year', date_added))/
-			sum(count(date_part('year', date_added))) OVER (ORDER BY date_part('year', date_added))
+			SUM(titles_qty)/
+			sum(SUM(titles_qty)) OVER (ORDER BY date_part('year', date_added))
 			as increase_percent
 	FROM
-		tv_shows
+		titles_added_daily
 	WHERE 
+		type = 'TV Show'
+	AND
 		/*Between 2008 and 2012 there were no additions,
 		we will only consider only years with consecutive additions*/
 		date_added > '2009-1-01' 
 	GROUP BY
 		year_added 
 	ORDER BY 
-		increase_percent DESC
+		increase_percent DESC,
+		year_added
 	) 
 	
 SELECT 
@@ -27,4 +31,4 @@ SELECT
 FROM 
 	increase_table
 WHERE 
-	year_added <> 2013
\ No newline at end of file
+	year_added <> 2013
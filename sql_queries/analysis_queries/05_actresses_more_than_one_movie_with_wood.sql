@@ -1,21 +1,24 @@
+/*person_costars is refreshed by the ETL (sql_queries/summary_queries/03_refresh_person_costars.sql)
+Index lookups: the person by name, its co-stars in more than one title (person_costars_repeated_idx), their gender in people*/
 SELECT 
-	cast_member,
-	count(cast_member) as qty_movies_with_woody
+	costar.person_name AS cast_member,
+	pc.shows_qty as qty_movies_with_woody
 FROM 
-	cast_members 
+	people person
+JOIN
+	person_costars pc
+ON
+	pc.person_id = person.person_id
+JOIN
+	people costar
+ON
+	costar.person_id = pc.costar_id
 WHERE 
-	show_id IN (SELECT 
-			show_id 
-		     FROM 
-			cast_members
-		     WHERE
-			cast_member = 'Woody Harrelson'
-		    )
+	person.person_name = 'Woody Harrelson'
 AND
-	gender = 'female'
-GROUP BY 
-	cast_member
-HAVING 
-	count(cast_member) >1
+	costar.gender = 'female'
+AND
+	pc.shows_qty >1
 ORDER BY
-	qty_movies_with_woody DESC
+	qty_movies_with_woody DESC,
+	cast_member
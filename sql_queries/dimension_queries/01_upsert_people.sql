@@ -0,0 +1,15 @@
+/*Adds the people :values (distinct names) with their genders :genders (same order)
+The gender of a person already in the table is only set if it was unknown, pending or failed*/
+INSERT INTO people (person_name, gender)
+SELECT 
+	*
+FROM 
+	unnest(CAST(:values AS text[]), CAST(:genders AS text[]))
+ON CONFLICT ON CONSTRAINT people_person_name_key DO UPDATE SET
+	gender = EXCLUDED.gender
+WHERE
+	EXCLUDED.gender IS NOT NULL
+AND
+	EXCLUDED.gender IS DISTINCT FROM people.gender
+AND
+	(people.gender IS NULL OR people.gender IN ('pending', 'request_failed'))
@@ -0,0 +1,5 @@
+/*Adds the genres :values (distinct) missing from the table*/
+INSERT INTO genres (genre)
+SELECT 
+	unnest(CAST(:values AS text[]))
+ON CONFLICT ON CONSTRAINT genres_genre_key DO NOTHING
@@ -0,0 +1,5 @@
+/*Adds the countries :values (distinct) missing from the table*/
+INSERT INTO countries (country)
+SELECT 
+	unnest(CAST(:values AS text[]))
+ON CONFLICT ON CONSTRAINT countries_country_key DO NOTHING
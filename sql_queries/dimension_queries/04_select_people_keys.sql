@@ -0,0 +1,8 @@
+/*Surrogate keys of the people :values*/
+SELECT 
+	person_name AS value,
+	person_id AS key
+FROM 
+	people
+WHERE 
+	person_name = ANY(:values)
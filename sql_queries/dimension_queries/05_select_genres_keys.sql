@@ -0,0 +1,8 @@
+/*Surrogate keys of the genres :values*/
+SELECT 
+	genre AS value,
+	genre_id AS key
+FROM 
+	genres
+WHERE 
+	genre = ANY(:values)
@@ -0,0 +1,8 @@
+/*Surrogate keys of the countries :values*/
+SELECT 
+	country AS value,
+	country_id AS key
+FROM 
+	countries
+WHERE 
+	country = ANY(:values)
@@ -0,0 +1,6 @@
+/*True when titles are loaded but the bridge tables were never filled (e.g. titles loaded before they existed)*/
+SELECT 
+	EXISTS (SELECT 1 FROM titles)
+	AND NOT EXISTS (SELECT 1 FROM title_people)
+	AND NOT EXISTS (SELECT 1 FROM title_genres)
+	AND NOT EXISTS (SELECT 1 FROM title_countries) AS bridge_tables_empty
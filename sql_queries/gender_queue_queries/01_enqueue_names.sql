@@ -0,0 +1,9 @@
+/*Queues the names :names, whose gender is pending
+A name already queued gets a new enqueued_at: a worker that claimed it before this transaction committed does not
+remove it from the queue (05_delete_names.sql), so the rows loaded by this transaction are backfilled too*/
+INSERT INTO gender_queue (cast_member)
+SELECT DISTINCT 
+	unnest(CAST(:names AS text[]))
+ON CONFLICT ON CONSTRAINT gender_queue_pkey DO UPDATE SET
+	enqueued_at = clock_timestamp(),
+	leased_until = NULL
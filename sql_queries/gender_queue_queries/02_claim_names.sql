@@ -0,0 +1,27 @@
+/*Claims up to :batch_size queued names for :lease_s seconds, oldest first
+Rows locked by another worker are skipped, so concurrent workers never claim the same names;
+names of a worker that died are claimed again once their lease has expired*/
+UPDATE gender_queue q SET
+	leased_until = clock_timestamp() + make_interval(secs => :lease_s),
+	attempts = q.attempts + 1
+FROM
+	(
+	SELECT 
+		cast_member 
+	FROM 
+		gender_queue 
+	WHERE 
+		leased_until IS NULL 
+	OR 
+		leased_until < clock_timestamp()
+	ORDER BY 
+		enqueued_at
+	LIMIT :batch_size
+	FOR UPDATE SKIP LOCKED
+	) AS claimed
+WHERE
+	q.cast_member = claimed.cast_member
+RETURNING
+	q.cast_member,
+	q.enqueued_at,
+	q.attempts
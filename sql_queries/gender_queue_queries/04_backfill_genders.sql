@@ -0,0 +1,9 @@
+/*Sets the gender of the pending rows of the names :names (:genders in the same order)*/
+UPDATE cast_members cm SET
+	gender = resolved.gender
+FROM
+	unnest(CAST(:names AS text[]), CAST(:genders AS text[])) AS resolved(cast_member, gender)
+WHERE
+	cm.cast_member = resolved.cast_member
+AND
+	cm.gender = 'pending'
@@ -0,0 +1,9 @@
+/*Removes the backfilled names :names from the queue, unless they were queued again since they were claimed
+(:enqueued_at, in the same order)*/
+DELETE FROM gender_queue q
+USING
+	unnest(CAST(:names AS text[]), CAST(:enqueued_at AS timestamptz[])) AS claimed(cast_member, enqueued_at)
+WHERE
+	q.cast_member = claimed.cast_member
+AND
+	q.enqueued_at = claimed.enqueued_at
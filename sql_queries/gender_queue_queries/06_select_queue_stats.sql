@@ -0,0 +1,6 @@
+/*Names queued, and among them names leased by a worker*/
+SELECT 
+	COUNT(*) AS queued_qty,
+	COUNT(*) FILTER (WHERE leased_until >= clock_timestamp()) AS leased_qty
+FROM 
+	gender_queue
@@ -0,0 +1,9 @@
+/*Sets the gender of the pending people :names (:genders in the same order): one row per person*/
+UPDATE people SET
+	gender = resolved.gender
+FROM
+	unnest(CAST(:names AS text[]), CAST(:genders AS text[])) AS resolved(cast_member, gender)
+WHERE
+	people.person_name = resolved.cast_member
+AND
+	people.gender = 'pending'
@@ -0,0 +1,3 @@
+CREATE TEMP TABLE IF NOT EXISTS titles_staging (
+	LIKE titles INCLUDING DEFAULTS
+) ON COMMIT DROP
\ No newline at end of file
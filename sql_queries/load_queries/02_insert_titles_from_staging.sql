@@ -0,0 +1,11 @@
+/*Titles already in the table are skipped by the primary key,
+RETURNING gives the show_ids actually inserted*/
+INSERT INTO titles (
+	show_id, type, title, director, country, rating, listed_in, description, content_hash)
+SELECT 
+	show_id, type, title, director, country, rating, listed_in, description, content_hash
+FROM 
+	titles_staging
+ON CONFLICT ON CONSTRAINT show_id_pkey DO NOTHING
+RETURNING 
+	show_id
\ No newline at end of file
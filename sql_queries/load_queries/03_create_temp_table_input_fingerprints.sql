@@ -0,0 +1,5 @@
+CREATE TEMP TABLE IF NOT EXISTS input_fingerprints (
+	show_id text NOT NULL,
+	content_hash bigint,
+	CONSTRAINT input_fingerprints_pkey PRIMARY KEY (show_id)
+) ON COMMIT DROP
\ No newline at end of file
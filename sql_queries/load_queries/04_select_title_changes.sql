@@ -0,0 +1,21 @@
+/*Titles loaded before content_hash existed (NULL hash) are reported as changed,
+so they are refreshed once by the first incremental load*/
+SELECT 
+	COALESCE(fp.show_id, tl.show_id) AS show_id,
+	CASE 
+		WHEN tl.show_id IS NULL THEN 'inserted'
+		WHEN fp.show_id IS NULL THEN 'removed'
+		ELSE 'changed' 
+	END AS change_type
+FROM 
+	input_fingerprints fp
+FULL OUTER JOIN 
+	titles tl
+ON 
+	tl.show_id = fp.show_id
+WHERE 
+	tl.show_id IS NULL
+OR
+	fp.show_id IS NULL
+OR
+	tl.content_hash IS DISTINCT FROM fp.content_hash
\ No newline at end of file
@@ -0,0 +1,6 @@
+DELETE FROM cast_members WHERE show_id = ANY(:show_ids);
+DELETE FROM movies WHERE show_id = ANY(:show_ids);
+DELETE FROM tv_shows WHERE show_id = ANY(:show_ids);
+DELETE FROM title_people WHERE show_id = ANY(:show_ids);
+DELETE FROM title_genres WHERE show_id = ANY(:show_ids);
+DELETE FROM title_countries WHERE show_id = ANY(:show_ids)
\ No newline at end of file
@@ -0,0 +1 @@
+DELETE FROM titles WHERE show_id = ANY(:show_ids)
\ No newline at end of file
@@ -0,0 +1,15 @@
+INSERT INTO titles (
+	show_id, type, title, director, country, rating, listed_in, description, content_hash)
+SELECT 
+	show_id, type, title, director, country, rating, listed_in, description, content_hash
+FROM 
+	titles_staging
+ON CONFLICT ON CONSTRAINT show_id_pkey DO UPDATE SET
+	type = EXCLUDED.type,
+	title = EXCLUDED.title,
+	director = EXCLUDED.director,
+	country = EXCLUDED.country,
+	rating = EXCLUDED.rating,
+	listed_in = EXCLUDED.listed_in,
+	description = EXCLUDED.description,
+	content_hash = EXCLUDED.content_hash
\ No newline at end of file
@@ -0,0 +1,12 @@
+/*Genders already resolved for these names (requests that failed are asked again, pending names are queued again)*/
+SELECT DISTINCT ON (cast_member)
+	cast_member,
+	gender
+FROM 
+	cast_members
+WHERE 
+	cast_member = ANY(:names)
+AND
+	gender IS NOT NULL
+AND
+	gender NOT IN ('request_failed', 'pending')
\ No newline at end of file
@@ -0,0 +1,8 @@
+/*show_ids of titles_staging not in titles yet (read before the gender lookup, the insert itself still skips
+titles loaded in the meantime)*/
+SELECT
+	st.show_id
+FROM
+	titles_staging st
+WHERE
+	NOT EXISTS (SELECT 1 FROM titles tl WHERE tl.show_id = st.show_id)
\ No newline at end of file
@@ -0,0 +1,16 @@
+/*Adds (:sign = 1) or subtracts (:sign = -1) the cast members of the titles :show_ids
+first_name is parsed by the ETL (update_data.split_names())*/
+INSERT INTO first_name_counts (first_name, first_name_qty)
+SELECT 
+	first_name,
+	:sign * COUNT(*) AS first_name_qty
+FROM
+	cast_members
+WHERE 
+	first_name is not null
+AND
+	show_id = ANY(:show_ids)
+GROUP BY 
+	first_name
+ON CONFLICT ON CONSTRAINT first_name_counts_pkey DO UPDATE SET
+	first_name_qty = first_name_counts.first_name_qty + EXCLUDED.first_name_qty
@@ -0,0 +1,19 @@
+/*Adds (:sign = 1) or subtracts (:sign = -1) the movies and tv_shows of the titles :show_ids*/
+INSERT INTO titles_added_daily (type, date_added, titles_qty)
+SELECT 
+	type,
+	date_added,
+	:sign * COUNT(*) AS titles_qty
+FROM
+	(
+	SELECT 'Movie' AS type, date_added FROM movies WHERE show_id = ANY(:show_ids)
+	UNION ALL
+	SELECT 'TV Show' AS type, date_added FROM tv_shows WHERE show_id = ANY(:show_ids)
+	) AS titles_added
+WHERE
+	date_added is not null
+GROUP BY 
+	type,
+	date_added
+ON CONFLICT ON CONSTRAINT titles_added_daily_pkey DO UPDATE SET
+	titles_qty = titles_added_daily.titles_qty + EXCLUDED.titles_qty
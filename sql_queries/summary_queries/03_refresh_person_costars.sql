@@ -0,0 +1,24 @@
+/*Adds (:sign = 1) or subtracts (:sign = -1) the pairs of people of the titles :show_ids (title_people)*/
+INSERT INTO person_costars (person_id, costar_id, shows_qty)
+SELECT 
+	tp.person_id,
+	tc.person_id AS costar_id,
+	:sign * COUNT(*) AS shows_qty
+FROM
+	title_people tp
+JOIN 
+	title_people tc
+ON
+	tc.show_id = tp.show_id
+AND
+	tc.person_id <> tp.person_id
+WHERE
+	tp.show_id = ANY(:show_ids)
+GROUP BY 
+	tp.person_id,
+	tc.person_id
+ORDER BY -- inserted in key order: the primary key index is filled sequentially
+	tp.person_id,
+	tc.person_id
+ON CONFLICT ON CONSTRAINT person_costars_pkey DO UPDATE SET
+	shows_qty = person_costars.shows_qty + EXCLUDED.shows_qty
@@ -0,0 +1,4 @@
+/*Rows left at zero after subtracting changed or removed titles*/
+DELETE FROM first_name_counts WHERE first_name_qty <= 0;
+DELETE FROM titles_added_daily WHERE titles_qty <= 0;
+DELETE FROM person_costars WHERE shows_qty <= 0
@@ -0,0 +1,3 @@
+DELETE FROM first_name_counts;
+DELETE FROM titles_added_daily;
+DELETE FROM person_costars
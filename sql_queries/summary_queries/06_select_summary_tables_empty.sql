@@ -0,0 +1,12 @@
+/*True when titles are loaded but the summary tables were never filled (e.g. titles loaded before they existed)*/
+SELECT 
+	(
+	EXISTS (SELECT 1 FROM titles)
+	AND NOT EXISTS (SELECT 1 FROM first_name_counts)
+	AND NOT EXISTS (SELECT 1 FROM titles_added_daily)
+	)
+	OR 
+	(
+	EXISTS (SELECT 1 FROM title_people)
+	AND NOT EXISTS (SELECT 1 FROM person_costars)
+	) AS summary_tables_empty
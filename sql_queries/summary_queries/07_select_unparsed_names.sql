@@ -0,0 +1,9 @@
+/*Names of the cast members loaded before first_name and last_name existed*/
+SELECT DISTINCT
+	cast_member
+FROM
+	cast_members
+WHERE
+	cast_member is not null
+AND
+	first_name is null
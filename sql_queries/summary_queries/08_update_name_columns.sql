@@ -0,0 +1,10 @@
+/*Sets the parsed names of the names :names (:first_names and :last_names in the same order, update_data.split_names())*/
+UPDATE cast_members cm SET
+	first_name = parsed.first_name,
+	last_name = parsed.last_name
+FROM
+	unnest(CAST(:names AS text[]), CAST(:first_names AS text[]), CAST(:last_names AS text[])) AS parsed(cast_member, first_name, last_name)
+WHERE
+	cm.cast_member = parsed.cast_member
+AND
+	cm.first_name is null
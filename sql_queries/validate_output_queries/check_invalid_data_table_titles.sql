@@ -1,8 +0,0 @@
-SELECT 
-	count(*) as invalid_title_type_qty
-FROM
-	titles
-WHERE
-	type <> 'TV Show'
-AND
-	type <> 'Movie'
\ No newline at end of file
@@ -1,8 +1,25 @@
 import unittest
+from unittest import mock
 from datetime import datetime
 import pandas as pd
 import random
+import os
+import tempfile
+import time
 import update_data
+import gender_cache
+import gender_lookup
+import gender_model
+import bulk_load
+import data_quality
+import snapshot
+import instrumentation
+import name_normalization
+import pipeline_executor
+from sqlalchemy import create_engine
+import asyncio
+from benchmarks.stub_gender_server import start_stub_server
+from benchmarks import synthetic_catalogue
 
 class TestNetflixOutput(unittest.TestCase):
     """Test the functions that treat and prepare the data to update the db tables
@@ -49,6 +66,62 @@ class TestNetflixOutput(unittest.TestCase):
         self.assertEqual(expected_col_dtypes,actual_col_dtypes,'Data types must be the same as expected' )
 
 
+    def test_create_cast_members_df_values(self):
+        """Test the values returned by update_data.create_cast_members_df()
+        Checks:
+        * one record per cast member, in input order
+        * names are stripped
+        * titles without cast keep one record with NaN cast_member
+        """
+
+        netflix_df = pd.DataFrame({
+            'show_id':['s1','s2','s3'],
+            'cast':['João Miguel, Bianca Comparato',float('nan'),' Tedd Chan ']})
+        cast_members_df = update_data.create_cast_members_df(netflix_df = netflix_df)
+
+        expected_df = pd.DataFrame({
+            'show_id':['s1','s1','s2','s3'],
+            'cast_member':['João Miguel','Bianca Comparato',float('nan'),'Tedd Chan']})
+        pd.testing.assert_frame_equal(cast_members_df,expected_df)
+
+
+    def test_split_names(self):
+        """Test the function update_data.split_names() (cast_members.first_name and last_name)
+        Checks:
+        * first name before the first space, last name after the last space
+        * a single name is its own first name, without last name; missing names stay missing
+        * same names with Arrow strings (compact input dtypes), index kept
+        """
+
+        names = pd.Series(['Woody Harrelson','Samuel L. Jackson','Cher',None],index = [3,5,7,9])
+        expected_df = pd.DataFrame({
+            'first_name':['Woody','Samuel','Cher',None],
+            'last_name':['Harrelson','Jackson',None,None]},index = [3,5,7,9])
+        pd.testing.assert_frame_equal(update_data.split_names(names),expected_df)
+
+        arrow_names_df = update_data.split_names(names.astype(update_data.INPUT_DTYPES['cast']))
+        self.assertEqual(arrow_names_df.first_name.dtype,update_data.INPUT_DTYPES['cast'])
+        pd.testing.assert_frame_equal(arrow_names_df.astype(object).fillna(pd.NA),expected_df.fillna(pd.NA))
+
+
+    def test_split_list_column(self):
+        """Test the function update_data.split_list_column() (rows of the genres and countries bridge tables)
+        Checks:
+        * one record per title and value, values stripped, in input order
+        * titles without value, empty values (trailing commas) and repeated values are skipped
+        """
+
+        netflix_df = pd.DataFrame({
+            'show_id':['s1','s2','s3','s4'],
+            'country':['United States, India',float('nan'),'France,','Japan, Japan']})
+        bridge_df = update_data.split_list_column(netflix_df,'country')
+
+        expected_df = pd.DataFrame({
+            'show_id':['s1','s1','s3','s4'],
+            'value':['United States','India','France','Japan']})
+        pd.testing.assert_frame_equal(bridge_df,expected_df)
+
+
     def test_threading_gender_request(self):
         """Test the function update_data.update_table_title()
         Checks:
@@ -62,7 +135,8 @@ class TestNetflixOutput(unittest.TestCase):
         cast_members_df = update_data.create_cast_members_df(netflix_df = self.netflix_titles_sample)
         # 50 requests should be enough for testing purpose
         cast_members_gender_df =  cast_members_df.sample(50)
-        gender_df = update_data.threading_gender_request(cast_members_gender_df,qty_threads = 20)  
+        # Without the persistent cache: every name is requested, the repository cache is not written
+        gender_df = update_data.threading_gender_request(cast_members_gender_df,qty_threads = 20,use_cache = False)
 
         # Test API connection
         qty_request_fail = len(gender_df[gender_df.gender == 'request_failed'])
@@ -85,7 +159,522 @@ class TestNetflixOutput(unittest.TestCase):
         self.assertEqual(expected_col_dtypes,actual_col_dtypes,'Data types must be the same as expected' )
 
 
-    def test_update_table_title(self): 
+    def test_async_gender_lookup(self):
+        """Test the asyncio engine gender_lookup.lookup_genders() against the local stub API
+        Checks:
+        * transient failures (503) are retried until they succeed
+        * persistent failures (500) end as "request_failed" after max_retries
+        * columns names and stats
+        * rate limits that would never let a request through are rejected, a rate below 1 request/s is accepted
+        """
+
+        for rate in [0,-1]:
+            with self.assertRaises(ValueError):
+                gender_lookup.TokenBucket(rate)
+        asyncio.run(asyncio.wait_for(gender_lookup.TokenBucket(0.5).acquire(),timeout = 1))
+
+        server, api_url = start_stub_server(latency_s = 0.01,failure_rate = 0.3,always_fail_names = {'Tedd Chan'})
+        names_list = ['João Miguel','Bianca Comparato','Tedd Chan',float('nan')] + [f'Name{i} Surname' for i in range(30)]
+        gender_df, stats = asyncio.run(gender_lookup.lookup_genders(
+            names_list,concurrency = 5,rate_limit = 1000,max_retries = 10,backoff_s = 0.001,api_url = api_url))
+        server.shutdown()
+
+        genders = dict(zip(gender_df.cast_member,gender_df.gender))
+        self.assertEqual(genders['Bianca Comparato'],'female')
+        self.assertEqual(genders['Tedd Chan'],'request_failed')
+        self.assertEqual(stats['failed'],1,'Only the name that always fails may end as request_failed')
+        self.assertEqual(server.requests_qty,len(gender_df) + stats['retries'])
+        self.assertEqual(gender_df.columns.tolist(),['cast_member','gender'])
+        self.assertEqual(gender_df.dtypes.tolist(),['O','O'])
+
+
+    def test_name_normalization(self):
+        """Test the canonical name keys used by the gender lookups (name_normalization.py)
+        Checks:
+        * whitespace, case, accents, punctuation and name order variants share one key, other names do not
+        * only one name per key is requested and its gender is given to every spelling
+        """
+
+        cast_members_df = pd.DataFrame({
+            'show_id':['s1','s1','s2','s2','s3','s3',None],
+            'cast_member':['João Miguel','Joao  Miguel','joão miguel','Miguel João','Ahmed el-Sakka','Ahmed El Sakka',
+                           float('nan')]})
+        name_index = name_normalization.build_name_index(cast_members_df.cast_member)
+        self.assertEqual(name_index.name_key.nunique(),2)
+        self.assertEqual(set(name_index.lookup_name),{'João Miguel','Ahmed el-Sakka'})
+        self.assertNotEqual(
+            name_normalization.canonical_name_key('Bianca Comparato'),
+            name_normalization.canonical_name_key('Bianca Comparatto'))
+
+        server, api_url = start_stub_server()
+        gender_df = update_data.async_gender_request(cast_members_df,use_cache = False,api_url = api_url)
+        server.shutdown()
+        self.assertEqual(server.requests_qty,2,'One request per canonical key')
+        self.assertEqual(sorted(gender_df.cast_member),sorted(cast_members_df.cast_member.dropna()))
+        self.assertEqual(set(gender_df.gender[gender_df.cast_member.str.contains('Miguel')]),{'male'})
+
+
+    def test_gender_model(self):
+        """Test the offline first-name gender model (gender_model.py)
+        Checks:
+        * the model is trained on the API labels of the gender cache, without "UNKNOWN" and "request_failed" entries
+        * only first names with enough labelled names and a majority share above the threshold are kept
+        * names with a confident first name are resolved without API requests, the others are requested
+        * genders resolved by the model are not written to the cache, so they never become training labels
+        * the leave-one-out evaluation does not count a name in its own prediction
+        """
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir,'gender_cache.db')
+            gender_cache.write_cached_genders(
+                pd.DataFrame({
+                    'cast_member':['Ana Test','Ana Other','ANA Third','Ana Fourth','João Miguel','Joao Silva',
+                                   'Joao Santos','Kim Lee','Kim Park','Kim Cho','Tedd Chan'],
+                    'gender':['female','female','female','female','male','male','male','female','male','UNKNOWN',
+                              'request_failed']}),
+                cache_path)
+            labelled_df = gender_model.read_labelled_names(cache_path)
+            self.assertEqual(len(labelled_df),9)
+            model_df = gender_model.build_first_name_model(labelled_df,threshold = 0.9,min_count = 3)
+            self.assertEqual(model_df.gender.to_dict(),{'ana':'female','joao':'male'})
+
+            server, api_url = start_stub_server()
+            cast_members_df = pd.DataFrame({
+                'show_id':['s1','s1','s2'],
+                'cast_member':['Ana New','João New','Kim New']})
+            gender_df = update_data.async_gender_request(
+                cast_members_df,cache_path = cache_path,api_url = api_url,first_name_model = model_df)
+            server.shutdown()
+            self.assertEqual(server.requests_qty,1,'Only the ambiguous first name is requested')
+            self.assertEqual(
+                dict(zip(gender_df.cast_member,gender_df.gender)),
+                {'Ana New':'female','João New':'male','Kim New':'male'})
+            new_labels = set(gender_model.read_labelled_names(cache_path).cast_member) - set(labelled_df.cast_member)
+            self.assertEqual(new_labels,{'Kim New'},'Only the API answer becomes a training label')
+
+        report_df = gender_model.evaluate_model(labelled_df,thresholds = [0.9],min_count = 3)
+        # Without itself, each "Ana" has 3 labelled names left and each "Joao" only 2 (under min_count)
+        self.assertEqual(report_df.loc[0,['labelled_names','resolved_names','accuracy']].tolist(),[9,4,1.0])
+
+
+    def test_gender_checkpoint(self):
+        """Test the checkpointed gender lookup (batches written to the gender cache as they arrive)
+        Checks:
+        * a lookup interrupted after two batches keeps them, the next run only requests the other names
+        * update_table_cast_members() can read the genders from the checkpoint, names resolved by the first-name
+          model (not cached) being resolved by it again
+        """
+
+        names_list = [f'Name{i} Surname' for i in range(35)]
+        cast_members_df = pd.DataFrame({'show_id':'s1','cast_member':names_list})
+        server, api_url = start_stub_server()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir,'gender_cache.db')
+            batches = []
+
+            def checkpoint_then_fail(batch_df):
+                gender_cache.write_cached_genders(batch_df,cache_path)
+                batches.append(batch_df)
+                if len(batches) == 2:
+                    raise KeyboardInterrupt('lookup interrupted')
+
+            with self.assertRaises(KeyboardInterrupt):
+                asyncio.run(gender_lookup.lookup_genders(
+                    names_list,concurrency = 1,api_url = api_url,on_batch = checkpoint_then_fail,batch_size = 10))
+            requests_before_restart = server.requests_qty
+            self.assertEqual(len(gender_cache.read_cached_genders(names_list,cache_path)),20)
+
+            gender_df = update_data.async_gender_request(
+                cast_members_df,cache_path = cache_path,api_url = api_url,checkpoint_size = 10)
+            self.assertEqual(server.requests_qty - requests_before_restart,15,'Only names missing from the checkpoint')
+            self.assertEqual(sorted(gender_df.cast_member),sorted(names_list))
+
+            model_df = gender_model.build_first_name_model(
+                pd.DataFrame({'cast_member':['Zelda A','Zelda B','Zelda C'],'gender':'female'}),min_count = 3)
+            model_names_df = pd.DataFrame({'show_id':'s2','cast_member':['Zelda New','Zelda Other']})
+            update_data.async_gender_request(
+                model_names_df,cache_path = cache_path,api_url = api_url,first_name_model = model_df)
+
+            engine = create_engine('sqlite://')
+            with engine.begin() as conn:
+                update_data.update_table_cast_members(
+                    pd.concat([cast_members_df,model_names_df],ignore_index = True),
+                    conn = conn,
+                    cache_path = cache_path,
+                    first_name_model = model_df)
+                cast_members_db_df = pd.read_sql_query('SELECT * FROM cast_members',conn)
+        server.shutdown()
+        self.assertEqual(len(cast_members_db_df),37)
+        self.assertTrue(cast_members_db_df.gender.isin(['male','female']).all())
+        self.assertEqual(set(cast_members_db_df.gender[cast_members_db_df.show_id == 's2']),{'female'})
+
+
+    def test_deferred_gender_request(self):
+        """Test the deferred gender feature (etl_pipeline(defer_gender = True), backfilled by gender_worker.py)
+        Checks:
+        * cached names get their gender, the others are 'pending', with no API request
+        * every spelling of a pending name is pending (the worker backfills each spelling queued)
+        """
+
+        cast_members_df = pd.DataFrame({
+            'show_id':['s1','s1','s2','s2'],
+            'cast_member':['Anna Known','Pedro Unknown','Unknown Pedro','Anna Known']})
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir,'gender_cache.db')
+            gender_cache.write_cached_genders(
+                pd.DataFrame({'cast_member':['Anna Known'],'gender':['female']}),cache_path)
+            gender_df = update_data.deferred_gender_request(cast_members_df,cache_path = cache_path)
+        genders = gender_df.set_index('cast_member').gender
+        self.assertEqual(len(gender_df),3)
+        self.assertEqual(genders['Anna Known'],'female')
+        self.assertEqual(genders['Pedro Unknown'],update_data.PENDING_GENDER)
+        self.assertEqual(genders['Unknown Pedro'],update_data.PENDING_GENDER)
+
+
+    def test_gender_cache(self):
+        """Test the persistent gender cache used by update_data.threading_gender_request()
+        Checks:
+        * cached names are returned without API requests
+        * "request_failed" entries are not served (retried on the next run)
+        * expired entries are evicted
+        """
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir,'gender_cache.db')
+            gender_cache.write_cached_genders(
+                pd.DataFrame({
+                    'cast_member':['João Miguel','Bianca Comparato','Tedd Chan'],
+                    'gender':['male','female','request_failed']}),
+                cache_path)
+
+            # Only cached names: no request is sent, so no result can be "request_failed"
+            cast_members_df = pd.DataFrame({'show_id':['s1','s1'],'cast_member':['João Miguel','Bianca Comparato']})
+            gender_df = update_data.threading_gender_request(cast_members_df,qty_threads = 2,cache_path = cache_path)
+            self.assertEqual(
+                sorted(zip(gender_df.cast_member,gender_df.gender)),
+                [('Bianca Comparato','female'),('João Miguel','male')])
+
+            # Failed requests are not served from the cache
+            cached_df = gender_cache.read_cached_genders(['Tedd Chan'],cache_path)
+            self.assertEqual(len(cached_df),0,'request_failed entries must be retried')
+
+            # Expired entries are evicted ("Tedd Chan" was already evicted by threading_gender_request())
+            deleted = gender_cache.evict_expired_entries(cache_path,ttl_days = -1)
+            self.assertEqual(deleted,2)
+
+
+    def test_bulk_load(self):
+        """Test the function bulk_load.copy_df_to_table() with a non-Postgres engine (to_sql fallback)
+        Checks:
+        * all rows are loaded, NULL values included
+        * int columns with NaN are sent as integers
+        """
+
+        movies_df = pd.DataFrame({
+            'show_id':['s1','s2','s3'],
+            'movie_length_min':[90,float('nan'),120]})
+        self.assertEqual(bulk_load._prepare_copy_chunk(movies_df).movie_length_min.dtype,'Int64')
+
+        conn = create_engine('sqlite://').connect()
+        conn.execute('CREATE TABLE movies (show_id text NOT NULL, movie_length_min int)')
+        rows_qty = bulk_load.copy_df_to_table(movies_df,'movies',conn,chunk_size = 2)
+        loaded_df = pd.read_sql_query('SELECT * FROM movies ORDER BY show_id',conn)
+        conn.close()
+
+        self.assertEqual(rows_qty,3)
+        pd.testing.assert_frame_equal(loaded_df,movies_df)
+
+
+    def test_data_quality_query(self):
+        """Test the single-pass query of table titles built by data_quality.build_quality_query()
+        Checks:
+        * null values and invalid data metrics come from the same query
+        * each report gets only its own columns
+        """
+
+        titles_df = pd.DataFrame({
+            'show_id':['s1','s2','s3','s4'],
+            'type':['Movie','TV Show','Documentary',None],
+            'title':['a','b','c','d'],
+            'director':[None,None,'x','y'],
+            'country':['x']*4,
+            'rating':['x']*4,
+            'listed_in':['x']*4,
+            'description':['x']*4})
+        conn = create_engine('sqlite://').connect()
+        titles_df.to_sql('titles',conn,index = False)
+        quality_df = pd.read_sql_query(data_quality.build_quality_query('titles'),conn)
+        conn.close()
+
+        null_df = data_quality.report_metrics(quality_df,'titles','null_values')
+        invalid_df = data_quality.report_metrics(quality_df,'titles','invalid_data')
+        self.assertEqual(null_df.type_null_qty[0],1)
+        self.assertEqual(null_df.director_null_percent[0],50)
+        self.assertEqual(null_df.title_null_qty[0],0)
+        self.assertEqual(list(invalid_df.columns),['invalid_title_type_qty'])
+        self.assertEqual(invalid_df.invalid_title_type_qty[0],1)
+
+
+    def test_snapshot(self):
+        """Test the Parquet snapshot (snapshot.export_snapshot() / read_snapshot_table())
+        Checks:
+        * tables read back equal to the exported ones, partition columns and NULL partition values included
+        """
+
+        tables = {
+            'titles':pd.DataFrame({'show_id':['s1','s2'],'type':['Movie','TV Show'],'title':['a','b']}),
+            'movies':pd.DataFrame({'show_id':['s1'],'release_year':[2000]}),
+            'tv_shows':pd.DataFrame({'show_id':['s2'],'release_year':[2010]}),
+            'cast_members':pd.DataFrame({
+                'show_id':['s1','s1','s1','s2','s2','s2'],
+                'cast_member':['Woody Harrelson','Ana Test','Bob Test','Woody Harrelson','Ana Test',None],
+                'gender':['male','female','male','male','female',None]}),
+            'people':pd.DataFrame({
+                'person_id':[1,2,3],
+                'person_name':['Woody Harrelson','Ana Test','Bob Test'],
+                'gender':['male','female','male']}),
+            'person_costars':pd.DataFrame({
+                'person_id':[1,2,1,3,2,3],'costar_id':[2,1,3,1,3,2],'shows_qty':[2,2,1,1,1,1]})}
+        conn = create_engine('sqlite://').connect()
+        for table_name,df in tables.items():
+            df.to_sql(table_name,conn,index = False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rows_qty = snapshot.export_snapshot(conn,tmp_dir + '/snapshot')
+            snapshot_tables = {
+                table_name:snapshot.read_snapshot_table(table_name,tmp_dir + '/snapshot') for table_name in tables}
+            female_df = snapshot.read_snapshot_table(
+                'cast_members',tmp_dir + '/snapshot',filter = snapshot.ds.field('gender') == 'female')
+        conn.close()
+
+        self.assertEqual(rows_qty['cast_members'],6)
+        for table_name,df in tables.items():
+            # Partitioned tables come back grouped by partition
+            pd.testing.assert_frame_equal(
+                snapshot_tables[table_name].sort_values(list(df.columns)).reset_index(drop = True),
+                df.sort_values(list(df.columns)).reset_index(drop = True))
+        self.assertEqual(female_df.cast_member.tolist(),['Ana Test','Ana Test'])
+
+
+    def test_offline_query_05(self):
+        """Test that snapshot.actresses_with_woody() gives the same result as analysis query 05 on the same tables
+        Checks (query run on SQLite, offline version on a snapshot of it):
+        * a cast member repeated in a title counts once (person_costars)
+        * the gender of the co-star is read from people (a pending gender backfilled there, not in cast_members)
+        """
+
+        tables = {
+            'titles':pd.DataFrame({'show_id':['s1','s2','s3'],'type':['Movie','Movie','TV Show']}),
+            'movies':pd.DataFrame({'show_id':['s1','s2']}),
+            'tv_shows':pd.DataFrame({'show_id':['s3']}),
+            'cast_members':pd.DataFrame({
+                'show_id':['s1','s1','s1','s1','s2','s2','s2','s3','s3'],
+                'cast_member':[
+                    'Woody Harrelson','Ana Test','Ana Test','Bea Test',
+                    'Woody Harrelson','Ana Test','Bea Test','Woody Harrelson','Carl Test'],
+                'gender':['male','female','female','pending','male','female','pending','male','male']}),
+            'people':pd.DataFrame({
+                'person_id':[1,2,3,4],
+                'person_name':['Woody Harrelson','Ana Test','Bea Test','Carl Test'],
+                'gender':['male','female','female','male']}),
+            # title_people: s1 and s2 {1, 2, 3}, s3 {1, 4}
+            'person_costars':pd.DataFrame({
+                'person_id':[1,2,1,3,2,3,1,4],
+                'costar_id':[2,1,3,1,3,2,4,1],
+                'shows_qty':[2,2,2,2,2,2,1,1]})}
+        conn = create_engine('sqlite://').connect()
+        for table_name,df in tables.items():
+            df.to_sql(table_name,conn,index = False)
+        sql_df = pd.read_sql_query(
+            update_data.read_query('sql_queries/analysis_queries/05_actresses_more_than_one_movie_with_wood.sql'),conn)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot.export_snapshot(conn,tmp_dir + '/snapshot')
+            offline_df = snapshot.actresses_with_woody(
+                snapshot.read_snapshot_table('people',tmp_dir + '/snapshot'),
+                snapshot.read_snapshot_table('person_costars',tmp_dir + '/snapshot'))
+        conn.close()
+
+        self.assertEqual(sql_df.to_dict('records'),[
+            {'cast_member':'Ana Test','qty_movies_with_woody':2},{'cast_member':'Bea Test','qty_movies_with_woody':2}])
+        pd.testing.assert_frame_equal(offline_df,sql_df)
+
+
+    def test_instrumentation(self):
+        """Test the stage metrics and JSON run summary of instrumentation.pipeline_run()
+        Checks:
+        * decorated functions and nested stages are recorded in start order, with their rows in/out
+        * the run summary is saved, also when the run fails
+        """
+
+        @instrumentation.instrumented()
+        def double_rows(df):
+            with instrumentation.stage('inner_stage'):
+                return pd.concat([df,df])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with instrumentation.pipeline_run('test_run',log_dir = tmp_dir) as run:
+                double_rows(pd.DataFrame({'a':range(10)}))
+            with self.assertRaises(ValueError):
+                with instrumentation.pipeline_run('test_failed_run',log_dir = tmp_dir) as failed_run:
+                    with instrumentation.stage('failed_stage'):
+                        raise ValueError('stage failed')
+            summaries_qty = len([f for f in os.listdir(tmp_dir) if f.startswith('run_summary_')])
+
+        self.assertEqual([record['name'] for record in run['stages']],['double_rows','inner_stage'])
+        self.assertEqual([record['depth'] for record in run['stages']],[0,1])
+        self.assertEqual((run['stages'][0]['rows_in'],run['stages'][0]['rows_out']),(10,20))
+        self.assertGreater(run['stages'][0]['rows_per_s'],0)
+        self.assertEqual((failed_run['status'],failed_run['stages'][0]['status']),('failed','failed'))
+        self.assertEqual(summaries_qty,2)
+
+
+    def test_pipeline_executor(self):
+        """Test the bounded-queue DAG executor pipeline_executor.run_pipeline()
+        Checks:
+        * every item goes through the stages (two workers on the middle stage)
+        * backpressure: the queues never hold more than queue_size items, the source waits for the slow sink
+        * one row of utilisation stats per stage
+        * an error in a stage stops the pipeline and is raised
+        """
+
+        results = []
+
+        def sink(item,emit):
+            time.sleep(0.005)
+            results.append(item)
+
+        stages = [
+            {'name':'source','function':lambda emit: [emit('numbers',i) for i in range(40)],'outputs':['numbers']},
+            {'name':'square','function':lambda i,emit: emit('squares',i*i),'input':'numbers','outputs':['squares'],
+             'workers':2},
+            {'name':'sink','function':sink,'input':'squares'}]
+        stats_df = pipeline_executor.run_pipeline(stages,queue_size = 2)
+
+        self.assertEqual(sorted(results),[i*i for i in range(40)])
+        self.assertEqual(stats_df.stage.tolist(),['source','square','sink'])
+        self.assertEqual(stats_df.items_qty.tolist(),[1,40,40])
+        self.assertLessEqual(stats_df.peak_input_queue.max(),2)
+        self.assertGreater(stats_df.set_index('stage').blocked_share['source'],0.5)
+        self.assertTrue(stats_df.utilisation.between(0,1).all())
+
+        def failing_sink(item,emit):
+            raise ValueError('sink failed')
+
+        with self.assertRaises(ValueError):
+            pipeline_executor.run_pipeline(stages[:2] + [{'name':'sink','function':failing_sink,'input':'squares'}])
+
+
+    def test_etl_batch_pipelined_failure(self):
+        """Test update_data.etl_batch_pipelined() when the load of a batch fails (SQLite engine)
+        Checks:
+        * the error is raised by the pipeline
+        * the batch committed before the failure is loaded, each of its titles with its movies/tv_shows and cast
+        * no title of the failed or later batches is left in the db (a rerun loads them again)
+        """
+
+        netflix_df = update_data.load_input(check_duplicates = False).head(12)
+        load_calls = []
+
+        def failing_cast_members_load(cast_members_df,gender_df,conn):
+            load_calls.append(len(cast_members_df))
+            if len(load_calls) == 2:
+                raise RuntimeError('cast batch failed')
+            original_cast_members_load(cast_members_df,gender_df,conn = conn)
+
+        def all_pending(cast_members_df,first_name_model,defer_gender):
+            names = cast_members_df.cast_member.dropna().unique()
+            return pd.DataFrame({'cast_member':names,'gender':update_data.PENDING_GENDER})
+
+        original_cast_members_load = update_data.update_table_cast_members
+        with tempfile.TemporaryDirectory() as db_dir:
+            engine = create_engine('sqlite:///' + os.path.join(db_dir,'netflix.db'))
+            # The load lock, dimensions, gender queue and summary tables use postgresql statements
+            with mock.patch.multiple(
+                    update_data,
+                    get_engine = lambda: engine,
+                    lock_load_writes = lambda conn: None,
+                    create_gender_feature = all_pending,
+                    update_table_cast_members = failing_cast_members_load,
+                    update_dimension_tables = lambda *args: None,
+                    enqueue_pending_genders = lambda *args: None,
+                    refresh_summary_tables = lambda *args: None):
+                with self.assertRaisesRegex(RuntimeError,'cast batch failed'):
+                    update_data.etl_batch_pipelined(netflix_df,batch_titles = 4,queue_size = 1)
+            with engine.connect() as conn:
+                tables = {
+                    table_name:pd.read_sql_query(f'SELECT show_id FROM {table_name}',conn).show_id
+                    for table_name in ['titles','movies','tv_shows','cast_members']}
+            engine.dispose()
+
+        first_batch = netflix_df.show_id.head(4)
+        self.assertEqual(sorted(tables['titles']),sorted(first_batch))
+        self.assertEqual(
+            sorted(pd.concat([tables['movies'],tables['tv_shows']])),sorted(first_batch),
+            'One movies/tv_shows row per title committed')
+        self.assertEqual(len(tables['cast_members']),load_calls[0])
+        self.assertTrue(tables['cast_members'].isin(first_batch).all())
+
+
+    def test_synthetic_catalogue(self):
+        """Test the benchmark catalogue generator benchmarks.synthetic_catalogue.write_catalogue()
+        Checks:
+        * same columns as the real input, unique show_ids, same catalogue for the same seed
+        * the pipeline transforms accept it (dates and durations parsed, cast lists split)
+        """
+
+        real_df = update_data.load_input(check_duplicates = False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = synthetic_catalogue.write_catalogue(tmp_dir + '/catalogue.csv',2500,seed = 1,chunk_size = 1000)
+            catalogue_df = update_data.load_input(check_duplicates = False,file_path = file_path)
+        same_seed_df = pd.concat([
+            synthetic_catalogue.generate_catalogue(titles_qty,seed = 1,start_id = start,universe_titles = 2500)
+            for start,titles_qty in [(1,1000),(1001,1000),(2001,500)]],ignore_index = True)
+
+        self.assertEqual(catalogue_df.columns.tolist(),real_df.columns.tolist())
+        self.assertTrue(catalogue_df.show_id.is_unique and len(catalogue_df) == 2500)
+        pd.testing.assert_series_equal(
+            catalogue_df.cast.fillna(''),same_seed_df.cast.fillna(''),check_dtype = False) # compact dtypes of load_input()
+        titles_by_type = update_data.split_titles_by_type(catalogue_df)
+        self.assertEqual(sum(len(df) for df in titles_by_type.values()),2500)
+        self.assertTrue(titles_by_type['Movie'].movie_length_min.notna().any())
+        cast_members_df = update_data.create_cast_members_df(catalogue_df)
+        self.assertGreater(cast_members_df.cast_member.nunique(),2500)
+
+
+    def test_load_input_chunks(self):
+        """Test the function update_data.load_input_chunks() (streaming mode)
+        Checks:
+        * no chunk is larger than chunk_size
+        * chunks together are the same as the full input
+        """
+
+        chunk_size = 1000
+        chunks = list(update_data.load_input_chunks(chunk_size = chunk_size,check_duplicates = False))
+        self.assertLessEqual(max(len(chunk) for chunk in chunks),chunk_size)
+
+        netflix_titles_df = update_data.load_input(check_duplicates = False)
+        pd.testing.assert_frame_equal(pd.concat(chunks)[['show_id','type']],netflix_titles_df[['show_id','type']])
+
+
+    def test_compute_content_hash(self):
+        """Test the function update_data.compute_content_hash() (fingerprint of the incremental load)
+        Checks:
+        * the same content has the same hash, even if release_year was read as float
+        * any change in a column changes the hash
+        """
+
+        content_hash = update_data.compute_content_hash(self.netflix_titles_sample)
+        float_year_hash = update_data.compute_content_hash(
+            self.netflix_titles_sample.astype({'release_year':'float'}))
+        pd.testing.assert_series_equal(content_hash,float_year_hash)
+
+        changed_sample = self.netflix_titles_sample.copy()
+        changed_sample.loc[changed_sample.index[0],'rating'] = 'changed rating'
+        changed_hash = update_data.compute_content_hash(changed_sample)
+        self.assertNotEqual(changed_hash.iloc[0],content_hash.iloc[0])
+        self.assertTrue((changed_hash.iloc[1:] == content_hash.iloc[1:]).all())
+
+
+    def test_update_table_title(self):
         """Test the function update_data.update_table_title()
         Checks:
         * columns names
@@ -133,6 +722,57 @@ class TestNetflixOutput(unittest.TestCase):
         self.assertEqual(expected_col_dtypes,actual_col_dtypes,'Data types must be the same as expected' )
 
 
+    def test_split_titles_by_type(self):
+        """Test the vectorized transforms of update_data.split_titles_by_type()
+        Checks:
+        * date_added with surrounding whitespace is parsed, NaN -> NaT
+        * duration without numbers -> NaN
+        * titles are split by type into the movies and tv_shows frames
+        """
+
+        netflix_df = pd.DataFrame({
+            'show_id':['s1','s2','s3','s4'],
+            'type':['Movie','TV Show','Movie','TV Show'],
+            'date_added':[' March 31, 2017',float('nan'),'January 1, 2020','December 20, 2018'],
+            'release_year':[2016,2019,2019,2018],
+            'duration':['90 min','2 Seasons','unknown','1 Season']})
+        titles_by_type = update_data.split_titles_by_type(netflix_df)
+
+        expected_movies_df = pd.DataFrame(
+            {'show_id':['s1','s3'],
+             'date_added':pd.to_datetime(['2017-03-31','2020-01-01']),
+             'release_year':[2016,2019],
+             'movie_length_min':[90,float('nan')]},
+            index = [0,2])
+        expected_tv_shows_df = pd.DataFrame(
+            {'show_id':['s2','s4'],
+             'date_added':pd.to_datetime([None,'2018-12-20']),
+             'release_year':[2019,2018],
+             'season_qty':[2,1]},
+            index = [1,3])
+        pd.testing.assert_frame_equal(titles_by_type['Movie'],expected_movies_df)
+        pd.testing.assert_frame_equal(titles_by_type['TV Show'],expected_tv_shows_df)
+
+
+    def test_parallel_transform(self):
+        """Test update_data.transform_titles() with workers > 1 (parallel_transform.py)
+        Checks:
+        * same movies, tv_shows and cast_members records as the serial transforms, with both input dtypes
+        * movies/tv_shows keep the index of the input, the names of each title keep their cast order
+        """
+
+        for compact_dtypes in [True,False]:
+            netflix_df = update_data.load_input(False,compact_dtypes = compact_dtypes).sample(frac = 1,random_state = 0)
+            serial_titles, serial_cast_members_df = update_data.transform_titles(netflix_df)
+            parallel_titles, parallel_cast_members_df = update_data.transform_titles(netflix_df,workers = 3)
+
+            for title_type,titles_df in serial_titles.items():
+                pd.testing.assert_frame_equal(parallel_titles[title_type].sort_index(),titles_df.sort_index())
+            pd.testing.assert_frame_equal(
+                parallel_cast_members_df.sort_values('show_id',kind = 'stable',ignore_index = True),
+                serial_cast_members_df.sort_values('show_id',kind = 'stable',ignore_index = True))
+
+
     def test_update_tv_shows(self): 
         """Test the function update_data.update_tv_shows()
         Checks: